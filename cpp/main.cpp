@@ -31,6 +31,21 @@ struct TimeKeeper {
     }
 };
 
+// -------------------- result record --------------------
+// Write one JSON record for the local runner; SOLVER_RESULT_PATH is never set on the judge.
+void write_result(int score, int actions, const vector<int>& candidates, const vector<double>& phase_times) {
+    const char* result_path = getenv("SOLVER_RESULT_PATH");
+    if (result_path == nullptr) return;
+    ofstream ofs(result_path);
+    auto join = [](const auto& values) {
+        ostringstream oss;
+        for (size_t i = 0; i < values.size(); ++i) oss << (i ? ", " : "") << values[i];
+        return oss.str();
+    };
+    ofs << "{\"score\": " << score << ", \"actions\": " << actions << ", \"candidates\": [" << join(candidates)
+        << "], \"phase_times\": [" << join(phase_times) << "]}" << endl;
+}
+
 // -------------------- State class --------------------
 struct State {
     int N;
@@ -220,6 +235,8 @@ int main() {
     }
 
     auto steps = recall_steps(state);
+    vector<int> candidates;      // candidate states evaluated per phase
+    vector<double> phase_times;  // elapsed seconds at the end of each phase
 
     // d = 1
     vector<State> states = {state};
@@ -246,6 +263,8 @@ int main() {
             states.push_back(st);
         }
     }
+    candidates.push_back((int)states.size() - 1);
+    phase_times.push_back(time_keeper1.elapsed_time());
 
     auto best_state = *max_element(states.begin(), states.end(), [](const State& a, const State& b) {
         return a.calculate_score() < b.calculate_score();
@@ -277,6 +296,8 @@ int main() {
             states.push_back(st);
         }
     }
+    candidates.push_back((int)states.size() - 1);
+    phase_times.push_back(time_keeper1.elapsed_time());
 
     best_state = *max_element(states.begin(), states.end(), [](const State& a, const State& b) {
         return a.calculate_score() < b.calculate_score();
@@ -308,6 +329,8 @@ int main() {
             states.push_back(st);
         }
     }
+    candidates.push_back((int)states.size() - 1);
+    phase_times.push_back(time_keeper1.elapsed_time());
 
     best_state = *max_element(states.begin(), states.end(), [](const State& a, const State& b) {
         return a.calculate_score() < b.calculate_score();
@@ -317,6 +340,7 @@ int main() {
 
     // 出力
     cerr << "score " << score << endl;
+    write_result(score, (int)best_state.actions.size(), candidates, phase_times);
     best_state.output_actions();
 
     return 0;
@@ -1,4 +1,32 @@
+from lib.math import inv_mod
+
 MOD = 998244353
+# Three NTT primes whose product (about 5.95e25) bounds what convolution_any_mod can reconstruct
+GARNER_PRIMES = (167772161, 469762049, 754974721)
+# Longest transform convolution_float stays exact for: the worst-case rounding error, measured
+# with every coefficient at the extremes, is 0.0625 at 2**20 and 0.25 at 2**22
+FLOAT_FFT_MAX_SIZE = 1 << 20
+# Up to these sizes convolution uses the schoolbook product: min(len(a), len(b)) against the
+# NTT, len(a) * len(b) against the float FFT (about 100 us of numpy overhead)
+NAIVE_MAX_SIZE = 40
+NAIVE_MAX_PRODUCT = 512
+# mod -> (primitive root, sum_e, sum_ie), shared by every FFT instance for that modulus
+ROOT_TABLES = {}
+# numpy once load_numpy has run (False when it is not installed); importing it costs about 100 ms,
+# which a solver that never reaches a float or vector path should not pay
+_numpy = None
+
+
+def load_numpy():
+    # The numpy module, or None when it is not installed
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+        except ImportError:
+            numpy = False
+        _numpy = numpy
+    return _numpy or None
 
 
 class FFT():
@@ -48,35 +76,42 @@ class FFT():
             res += 1
             x //= 2
         return res
-    butterfly_first = True
-    butterfly_inv_first = True
-    sum_e = [0]*30
-    sum_ie = [0]*30
 
     def __init__(self, MOD):
         self.mod = MOD
-        self.g = self.primitive_root_constexpr(self.mod)
+        if self.mod not in ROOT_TABLES:
+            ROOT_TABLES[self.mod] = self.root_tables()
+        self.g, self.sum_e, self.sum_ie = ROOT_TABLES[self.mod]
+
+    def root_tables(self):
+        g = self.primitive_root_constexpr(self.mod)
+        es = [0]*30
+        ies = [0]*30
+        sum_e = [0]*30
+        sum_ie = [0]*30
+        cnt2 = self.bsf(self.mod-1)
+        e = pow(g, (self.mod-1) >> cnt2, self.mod)
+        ie = pow(e, self.mod-2, self.mod)
+        for i in range(cnt2, 1, -1):
+            es[i-2] = e
+            ies[i-2] = ie
+            e = (e*e) % self.mod
+            ie = (ie*ie) % self.mod
+        now = 1
+        for i in range(cnt2-2):
+            sum_e[i] = ((es[i]*now) % self.mod)
+            now *= ies[i]
+            now %= self.mod
+        now = 1
+        for i in range(cnt2-2):
+            sum_ie[i] = ((ies[i]*now) % self.mod)
+            now *= es[i]
+            now %= self.mod
+        return g, sum_e, sum_ie
 
     def butterfly(self, a):
         n = len(a)
         h = (n-1).bit_length()
-        if self.butterfly_first:
-            self.butterfly_first = False
-            es = [0]*30
-            ies = [0]*30
-            cnt2 = self.bsf(self.mod-1)
-            e = pow(self.g, (self.mod-1) >> cnt2, self.mod)
-            ie = pow(e, self.mod-2, self.mod)
-            for i in range(cnt2, 1, -1):
-                es[i-2] = e
-                ies[i-2] = ie
-                e = (e*e) % self.mod
-                ie = (ie*ie) % self.mod
-            now = 1
-            for i in range(cnt2-2):
-                self.sum_e[i] = ((es[i]*now) % self.mod)
-                now *= ies[i]
-                now %= self.mod
         for ph in range(1, h+1):
             w = 1 << (ph-1)
             p = 1 << (h-ph)
@@ -97,23 +132,6 @@ class FFT():
     def butterfly_inv(self, a):
         n = len(a)
         h = (n-1).bit_length()
-        if self.butterfly_inv_first:
-            self.butterfly_inv_first = False
-            es = [0]*30
-            ies = [0]*30
-            cnt2 = self.bsf(self.mod-1)
-            e = pow(self.g, (self.mod-1) >> cnt2, self.mod)
-            ie = pow(e, self.mod-2, self.mod)
-            for i in range(cnt2, 1, -1):
-                es[i-2] = e
-                ies[i-2] = ie
-                e = (e*e) % self.mod
-                ie = (ie*ie) % self.mod
-            now = 1
-            for i in range(cnt2-2):
-                self.sum_ie[i] = ((ies[i]*now) % self.mod)
-                now *= es[i]
-                now %= self.mod
         for ph in range(h, 0, -1):
             w = 1 << (ph-1)
             p = 1 << (h-ph)
@@ -135,16 +153,34 @@ class FFT():
         m = len(b)
         if not(a) or not(b):
             return []
-        if min(n, m) <= 40:
-            if n < m:
-                n, m = m, n
-                a, b = b, a
-            res = [0]*(n+m-1)
-            for i in range(n):
-                for j in range(m):
-                    res[i+j] += a[i]*b[j]
-                    res[i+j] %= self.mod
-            return res
+        z = 1 << ((n+m-2).bit_length())
+        if self.use_float(z):
+            if n*m <= NAIVE_MAX_PRODUCT:
+                return self.convolution_naive(a, b)
+            return self.convolution_float(a, b)
+        if min(n, m) <= NAIVE_MAX_SIZE:
+            return self.convolution_naive(a, b)
+        return self.convolution_ntt(a, b)
+
+    def use_float(self, z):
+        return z <= FLOAT_FFT_MAX_SIZE and self.mod < 1 << 30 and load_numpy() is not None
+
+    def convolution_naive(self, a, b):
+        n = len(a)
+        m = len(b)
+        if n < m:
+            n, m = m, n
+            a, b = b, a
+        res = [0]*(n+m-1)
+        for i in range(n):
+            for j in range(m):
+                res[i+j] += a[i]*b[j]
+                res[i+j] %= self.mod
+        return res
+
+    def convolution_ntt(self, a, b):
+        n = len(a)
+        m = len(b)
         z = 1 << ((n+m-2).bit_length())
         a = a+[0]*(z-n)
         b = b+[0]*(z-m)
@@ -158,3 +194,97 @@ class FFT():
         for i in range(n+m-1):
             c[i] = (c[i]*iz) % self.mod
         return c[:n+m-1]
+
+    def convolution_float(self, a, b):
+        n = len(a)
+        m = len(b)
+        z = 1 << ((n+m-2).bit_length())
+        return self.product_float(self.transform_float(a, z), self.transform_float(b, z), z, n+m-1)
+
+    def transform_float(self, a, z):
+        # numpy.fft on 15-bit limbs, for mod < 2**30.  Coefficients are taken in (-mod/2, mod/2]
+        # and split as hi * 2**15 + lo with |hi|, |lo| <= 2**14, so every limb product sum stays
+        # below 2**48 and rounds back to the exact integer up to FLOAT_FFT_MAX_SIZE.
+        assert len(a) <= z
+        np = load_numpy()
+        x = np.array(a, dtype=np.int64) % self.mod
+        x[x > self.mod // 2] -= self.mod
+        lo = ((x + (1 << 14)) & 0x7fff) - (1 << 14)
+        hi = (x - lo) >> 15
+        return np.fft.rfft(hi, z), np.fft.rfft(lo, z)
+
+    def product_float(self, fa, fb, z, length):
+        np = load_numpy()
+        (a_hi, a_lo), (b_hi, b_lo) = fa, fb
+        hi = np.rint(np.fft.irfft(a_hi * b_hi, z)[:length]).astype(np.int64) % self.mod
+        mid = np.rint(np.fft.irfft(a_hi * b_lo + a_lo * b_hi, z)[:length]).astype(np.int64) % self.mod
+        lo = np.rint(np.fft.irfft(a_lo * b_lo, z)[:length]).astype(np.int64) % self.mod
+        c = (hi * ((1 << 30) % self.mod) + mid * (1 << 15) + lo) % self.mod
+        return c.tolist()
+
+    # transform and cyclic_product let a caller transform an operand once and multiply it with
+    # several others: cyclic_product(transform(a, z), transform(b, z), z) is the cyclic
+    # convolution of length z (a power of two) of a and b.  Both pick the backend from z alone.
+
+    def transform(self, a, z):
+        if self.use_float(z):
+            return self.transform_float(a, z)
+        assert len(a) <= z
+        a = [x % self.mod for x in a]+[0]*(z-len(a))
+        self.butterfly(a)
+        return a
+
+    def cyclic_product(self, fa, fb, z, length=None):
+        # The first length coefficients (default all z)
+        length = z if length is None else length
+        if self.use_float(z):
+            return self.product_float(fa, fb, z, length)
+        c = [(x*y) % self.mod for x, y in zip(fa, fb)]
+        self.butterfly_inv(c)
+        iz = pow(z, self.mod-2, self.mod)
+        return [(x*iz) % self.mod for x in c[:length]]
+
+
+def _garner(c1, c2, c3, mod=None):
+    # The x in [0, m1 * m2 * m3) with x = c1, c2, c3 mod GARNER_PRIMES, as the mixed-radix digits
+    # x = r1 + m1 * t2 + m1 * m2 * t3; reduced mod mod unless mod is None
+    m1, m2, m3 = GARNER_PRIMES
+    i12 = inv_mod(m1, m2)
+    i13 = inv_mod(m1, m3)
+    i23 = inv_mod(m2, m3)
+    np = load_numpy()
+    if np is not None:
+        r1, r2, r3 = (np.array(c, dtype=np.int64) for c in (c1, c2, c3))
+        t2 = (r2 - r1) % m2 * i12 % m2
+        t3 = ((r3 - r1) % m3 * i13 % m3 - t2) % m3 * i23 % m3
+        if mod is not None and mod < 1 << 31:
+            # Every product stays below 2**62
+            return ((r1 % mod + t2 * (m1 % mod) % mod + t3 * (m1 * m2 % mod) % mod) % mod).tolist()
+        digits = zip(r1.tolist(), t2.tolist(), t3.tolist())
+    else:
+        digits = []
+        for r1, r2, r3 in zip(c1, c2, c3):
+            t2 = (r2 - r1) * i12 % m2
+            digits.append((r1, t2, ((r3 - r1) * i13 - t2) * i23 % m3))
+    if mod is None:
+        return [r1 + m1 * t2 + m1 * m2 * t3 for r1, t2, t3 in digits]
+    return [(r1 + m1 * t2 + m1 * m2 * t3) % mod for r1, t2, t3 in digits]
+
+
+def _convolution_garner_primes(a, b):
+    return [FFT(p).convolution([x % p for x in a], [x % p for x in b]) for p in GARNER_PRIMES]
+
+
+def convolution_any_mod(a, b, mod):
+    # Exact while len(a) + len(b) - 1 <= 2**24 and min(len(a), len(b)) * (mod - 1)**2 < 5.95e25
+    if not(a) or not(b):
+        return []
+    return _garner(*_convolution_garner_primes(a, b), mod)
+
+
+def convolution_int(a, b):
+    # Exact while every |result| < 167772161 * 469762049 * 754974721 / 2, about 2.97e25
+    if not(a) or not(b):
+        return []
+    m = GARNER_PRIMES[0] * GARNER_PRIMES[1] * GARNER_PRIMES[2]
+    return [x - m if x > m // 2 else x for x in _garner(*_convolution_garner_primes(a, b))]
@@ -1,3 +1,4 @@
+import operator
 import typing
 
 
@@ -208,3 +209,736 @@ class LazySegTree:
         self._all_apply(2 * k, self._lz[k])
         self._all_apply(2 * k + 1, self._lz[k])
         self._lz[k] = self._id
+
+
+class _MonoidLazySegTree(LazySegTree):
+    """
+    LazySegTree for the fixed (monoid, update) pair of a subclass: op is the class attribute _op
+    and e defaults to _identity.  Sums scale an update by the width of the node, known from its
+    index, so they need no (value, width) pairs.  Subclasses write op, mapping and composition
+    inline in _push, prod and apply; a tag equal to _update_identity is never pushed.  _op must be
+    a builtin so it is not bound as a method.
+    """
+
+    _op: typing.Callable[[typing.Any, typing.Any], typing.Any]
+    _identity: typing.Any
+    _update_identity: typing.Any
+
+    def __init__(
+            self,
+            v: typing.Union[int, typing.List[typing.Any]],
+            e: typing.Any = None) -> None:
+        self._e = self._identity if e is None else e
+
+        if isinstance(v, int):
+            v = [self._e] * v
+
+        self._n = len(v)
+        self._log = _ceil_pow2(self._n)
+        self._size = 1 << self._log
+        self._d = [self._e] * self._size + list(v) + [self._e] * (self._size - self._n)
+        self._lz = [self._update_identity] * self._size
+        # One level at a time with a C-level map
+        d = self._d
+        hi = self._size
+        while hi > 1:
+            lo = hi >> 1
+            d[lo:hi] = map(self._op, d[2 * lo: 2 * hi: 2], d[2 * lo + 1: 2 * hi: 2])
+            hi = lo
+
+    def set(self, p: int, x: typing.Any) -> None:
+        assert 0 <= p < self._n
+
+        p += self._size
+        for i in range(self._log, 0, -1):
+            self._push(p >> i)
+        self._d[p] = x
+        for i in range(1, self._log + 1):
+            self._update(p >> i)
+
+    def get(self, p: int) -> typing.Any:
+        assert 0 <= p < self._n
+
+        p += self._size
+        for i in range(self._log, 0, -1):
+            self._push(p >> i)
+        return self._d[p]
+
+    def max_right(
+            self, left: int, g: typing.Callable[[typing.Any], bool]) -> int:
+        assert 0 <= left <= self._n
+        assert g(self._e)
+
+        if left == self._n:
+            return self._n
+
+        left += self._size
+        for i in range(self._log, 0, -1):
+            self._push(left >> i)
+
+        sm = self._e
+        first = True
+        while first or (left & -left) != left:
+            first = False
+            while left % 2 == 0:
+                left >>= 1
+            if not g(self._op(sm, self._d[left])):
+                while left < self._size:
+                    self._push(left)
+                    left *= 2
+                    if g(self._op(sm, self._d[left])):
+                        sm = self._op(sm, self._d[left])
+                        left += 1
+                return left - self._size
+            sm = self._op(sm, self._d[left])
+            left += 1
+
+        return self._n
+
+    def min_left(self, right: int, g: typing.Any) -> int:
+        assert 0 <= right <= self._n
+        assert g(self._e)
+
+        if right == 0:
+            return 0
+
+        right += self._size
+        for i in range(self._log, 0, -1):
+            self._push((right - 1) >> i)
+
+        sm = self._e
+        first = True
+        while first or (right & -right) != right:
+            first = False
+            right -= 1
+            while right > 1 and right % 2:
+                right >>= 1
+            if not g(self._op(self._d[right], sm)):
+                while right < self._size:
+                    self._push(right)
+                    right = 2 * right + 1
+                    if g(self._op(self._d[right], sm)):
+                        sm = self._op(self._d[right], sm)
+                        right -= 1
+                return right + 1 - self._size
+            sm = self._op(self._d[right], sm)
+
+        return 0
+
+
+class AddMinLazySegTree(_MonoidLazySegTree):
+    # Range add, range min
+    _op = min
+    _identity = float("inf")
+    _update_identity = 0
+
+    def prod(self, left: int, right: int) -> typing.Any:
+        assert 0 <= left <= right <= self._n
+
+        if left == right:
+            return self._e
+
+        d = self._d
+        lz = self._lz
+        size = self._size
+        left += size
+        right += size
+
+        for i in range(self._log, 0, -1):
+            if ((left >> i) << i) != left:
+                k = left >> i
+                tag = lz[k]
+                if tag != 0:
+                    child = 2 * k
+                    d[child] += tag
+                    d[child + 1] += tag
+                    if child < size:
+                        lz[child] += tag
+                        lz[child + 1] += tag
+                    lz[k] = 0
+            if ((right >> i) << i) != right:
+                k = right >> i
+                tag = lz[k]
+                if tag != 0:
+                    child = 2 * k
+                    d[child] += tag
+                    d[child + 1] += tag
+                    if child < size:
+                        lz[child] += tag
+                        lz[child + 1] += tag
+                    lz[k] = 0
+
+        sml = smr = self._e
+        while left < right:
+            if left & 1:
+                a = d[left]
+                sml = sml if sml < a else a
+                left += 1
+            if right & 1:
+                right -= 1
+                b = d[right]
+                smr = b if b < smr else smr
+            left >>= 1
+            right >>= 1
+
+        return sml if sml < smr else smr
+
+    def apply(self, left: int, right: typing.Optional[int] = None,
+              f: typing.Optional[typing.Any] = None) -> None:
+        assert f is not None
+
+        d = self._d
+        lz = self._lz
+        size = self._size
+        if right is None:
+            assert 0 <= left < self._n
+
+            p = left + size
+            for i in range(self._log, 0, -1):
+                self._push(p >> i)
+            d[p] += f
+            for i in range(1, self._log + 1):
+                self._update(p >> i)
+            return
+
+        assert 0 <= left <= right <= self._n
+        if left == right:
+            return
+
+        left += size
+        right += size
+
+        for i in range(self._log, 0, -1):
+            if ((left >> i) << i) != left:
+                k = left >> i
+                tag = lz[k]
+                if tag != 0:
+                    child = 2 * k
+                    d[child] += tag
+                    d[child + 1] += tag
+                    if child < size:
+                        lz[child] += tag
+                        lz[child + 1] += tag
+                    lz[k] = 0
+            if ((right >> i) << i) != right:
+                k = (right - 1) >> i
+                tag = lz[k]
+                if tag != 0:
+                    child = 2 * k
+                    d[child] += tag
+                    d[child + 1] += tag
+                    if child < size:
+                        lz[child] += tag
+                        lz[child + 1] += tag
+                    lz[k] = 0
+
+        l2 = left
+        r2 = right
+        while left < right:
+            if left & 1:
+                d[left] += f
+                if left < size:
+                    lz[left] += f
+                left += 1
+            if right & 1:
+                right -= 1
+                d[right] += f
+                if right < size:
+                    lz[right] += f
+            left >>= 1
+            right >>= 1
+        left = l2
+        right = r2
+
+        for i in range(1, self._log + 1):
+            if ((left >> i) << i) != left:
+                k = left >> i
+                a = d[2 * k]
+                b = d[2 * k + 1]
+                d[k] = a if a < b else b
+            if ((right >> i) << i) != right:
+                k = (right - 1) >> i
+                a = d[2 * k]
+                b = d[2 * k + 1]
+                d[k] = a if a < b else b
+
+    def _push(self, k: int) -> None:
+        d = self._d
+        lz = self._lz
+        size = self._size
+        tag = lz[k]
+        if tag != 0:
+            child = 2 * k
+            d[child] += tag
+            d[child + 1] += tag
+            if child < size:
+                lz[child] += tag
+                lz[child + 1] += tag
+            lz[k] = 0
+
+
+class AddMaxLazySegTree(_MonoidLazySegTree):
+    # Range add, range max
+    _op = max
+    _identity = -float("inf")
+    _update_identity = 0
+
+    def prod(self, left: int, right: int) -> typing.Any:
+        assert 0 <= left <= right <= self._n
+
+        if left == right:
+            return self._e
+
+        d = self._d
+        lz = self._lz
+        size = self._size
+        left += size
+        right += size
+
+        for i in range(self._log, 0, -1):
+            if ((left >> i) << i) != left:
+                k = left >> i
+                tag = lz[k]
+                if tag != 0:
+                    child = 2 * k
+                    d[child] += tag
+                    d[child + 1] += tag
+                    if child < size:
+                        lz[child] += tag
+                        lz[child + 1] += tag
+                    lz[k] = 0
+            if ((right >> i) << i) != right:
+                k = right >> i
+                tag = lz[k]
+                if tag != 0:
+                    child = 2 * k
+                    d[child] += tag
+                    d[child + 1] += tag
+                    if child < size:
+                        lz[child] += tag
+                        lz[child + 1] += tag
+                    lz[k] = 0
+
+        sml = smr = self._e
+        while left < right:
+            if left & 1:
+                a = d[left]
+                sml = sml if sml > a else a
+                left += 1
+            if right & 1:
+                right -= 1
+                b = d[right]
+                smr = b if b > smr else smr
+            left >>= 1
+            right >>= 1
+
+        return sml if sml > smr else smr
+
+    def apply(self, left: int, right: typing.Optional[int] = None,
+              f: typing.Optional[typing.Any] = None) -> None:
+        assert f is not None
+
+        d = self._d
+        lz = self._lz
+        size = self._size
+        if right is None:
+            assert 0 <= left < self._n
+
+            p = left + size
+            for i in range(self._log, 0, -1):
+                self._push(p >> i)
+            d[p] += f
+            for i in range(1, self._log + 1):
+                self._update(p >> i)
+            return
+
+        assert 0 <= left <= right <= self._n
+        if left == right:
+            return
+
+        left += size
+        right += size
+
+        for i in range(self._log, 0, -1):
+            if ((left >> i) << i) != left:
+                k = left >> i
+                tag = lz[k]
+                if tag != 0:
+                    child = 2 * k
+                    d[child] += tag
+                    d[child + 1] += tag
+                    if child < size:
+                        lz[child] += tag
+                        lz[child + 1] += tag
+                    lz[k] = 0
+            if ((right >> i) << i) != right:
+                k = (right - 1) >> i
+                tag = lz[k]
+                if tag != 0:
+                    child = 2 * k
+                    d[child] += tag
+                    d[child + 1] += tag
+                    if child < size:
+                        lz[child] += tag
+                        lz[child + 1] += tag
+                    lz[k] = 0
+
+        l2 = left
+        r2 = right
+        while left < right:
+            if left & 1:
+                d[left] += f
+                if left < size:
+                    lz[left] += f
+                left += 1
+            if right & 1:
+                right -= 1
+                d[right] += f
+                if right < size:
+                    lz[right] += f
+            left >>= 1
+            right >>= 1
+        left = l2
+        right = r2
+
+        for i in range(1, self._log + 1):
+            if ((left >> i) << i) != left:
+                k = left >> i
+                a = d[2 * k]
+                b = d[2 * k + 1]
+                d[k] = a if a > b else b
+            if ((right >> i) << i) != right:
+                k = (right - 1) >> i
+                a = d[2 * k]
+                b = d[2 * k + 1]
+                d[k] = a if a > b else b
+
+    def _push(self, k: int) -> None:
+        d = self._d
+        lz = self._lz
+        size = self._size
+        tag = lz[k]
+        if tag != 0:
+            child = 2 * k
+            d[child] += tag
+            d[child + 1] += tag
+            if child < size:
+                lz[child] += tag
+                lz[child + 1] += tag
+            lz[k] = 0
+
+
+class AddSumLazySegTree(_MonoidLazySegTree):
+    # Range add, range sum
+    _op = operator.add
+    _identity = 0
+    _update_identity = 0
+
+    def prod(self, left: int, right: int) -> typing.Any:
+        assert 0 <= left <= right <= self._n
+
+        if left == right:
+            return self._e
+
+        d = self._d
+        lz = self._lz
+        size = self._size
+        left += size
+        right += size
+
+        for i in range(self._log, 0, -1):
+            if ((left >> i) << i) != left:
+                k = left >> i
+                tag = lz[k]
+                if tag != 0:
+                    child = 2 * k
+                    cw = 1 << (i - 1)
+                    d[child] += tag * cw
+                    d[child + 1] += tag * cw
+                    if child < size:
+                        lz[child] += tag
+                        lz[child + 1] += tag
+                    lz[k] = 0
+            if ((right >> i) << i) != right:
+                k = right >> i
+                tag = lz[k]
+                if tag != 0:
+                    child = 2 * k
+                    cw = 1 << (i - 1)
+                    d[child] += tag * cw
+                    d[child + 1] += tag * cw
+                    if child < size:
+                        lz[child] += tag
+                        lz[child + 1] += tag
+                    lz[k] = 0
+
+        sml = smr = self._e
+        while left < right:
+            if left & 1:
+                a = d[left]
+                sml = sml + a
+                left += 1
+            if right & 1:
+                right -= 1
+                b = d[right]
+                smr = b + smr
+            left >>= 1
+            right >>= 1
+
+        return sml + smr
+
+    def apply(self, left: int, right: typing.Optional[int] = None,
+              f: typing.Optional[typing.Any] = None) -> None:
+        assert f is not None
+
+        d = self._d
+        lz = self._lz
+        size = self._size
+        if right is None:
+            assert 0 <= left < self._n
+
+            p = left + size
+            for i in range(self._log, 0, -1):
+                self._push(p >> i)
+            d[p] += f
+            for i in range(1, self._log + 1):
+                self._update(p >> i)
+            return
+
+        assert 0 <= left <= right <= self._n
+        if left == right:
+            return
+
+        left += size
+        right += size
+
+        for i in range(self._log, 0, -1):
+            if ((left >> i) << i) != left:
+                k = left >> i
+                tag = lz[k]
+                if tag != 0:
+                    child = 2 * k
+                    cw = 1 << (i - 1)
+                    d[child] += tag * cw
+                    d[child + 1] += tag * cw
+                    if child < size:
+                        lz[child] += tag
+                        lz[child + 1] += tag
+                    lz[k] = 0
+            if ((right >> i) << i) != right:
+                k = (right - 1) >> i
+                tag = lz[k]
+                if tag != 0:
+                    child = 2 * k
+                    cw = 1 << (i - 1)
+                    d[child] += tag * cw
+                    d[child + 1] += tag * cw
+                    if child < size:
+                        lz[child] += tag
+                        lz[child + 1] += tag
+                    lz[k] = 0
+
+        l2 = left
+        r2 = right
+        w = 1
+        while left < right:
+            if left & 1:
+                d[left] += f * w
+                if left < size:
+                    lz[left] += f
+                left += 1
+            if right & 1:
+                right -= 1
+                d[right] += f * w
+                if right < size:
+                    lz[right] += f
+            left >>= 1
+            right >>= 1
+            w <<= 1
+        left = l2
+        right = r2
+
+        for i in range(1, self._log + 1):
+            if ((left >> i) << i) != left:
+                k = left >> i
+                a = d[2 * k]
+                b = d[2 * k + 1]
+                d[k] = a + b
+            if ((right >> i) << i) != right:
+                k = (right - 1) >> i
+                a = d[2 * k]
+                b = d[2 * k + 1]
+                d[k] = a + b
+
+    def _push(self, k: int) -> None:
+        d = self._d
+        lz = self._lz
+        size = self._size
+        w = size >> k.bit_length()  # width of the children of k
+        tag = lz[k]
+        if tag != 0:
+            child = 2 * k
+            d[child] += tag * w
+            d[child + 1] += tag * w
+            if child < size:
+                lz[child] += tag
+                lz[child + 1] += tag
+            lz[k] = 0
+
+
+class AssignSumLazySegTree(_MonoidLazySegTree):
+    # Range assign, range sum; None is no assignment
+    _op = operator.add
+    _identity = 0
+    _update_identity = None
+
+    def prod(self, left: int, right: int) -> typing.Any:
+        assert 0 <= left <= right <= self._n
+
+        if left == right:
+            return self._e
+
+        d = self._d
+        lz = self._lz
+        size = self._size
+        left += size
+        right += size
+
+        for i in range(self._log, 0, -1):
+            if ((left >> i) << i) != left:
+                k = left >> i
+                tag = lz[k]
+                if tag is not None:
+                    child = 2 * k
+                    cw = 1 << (i - 1)
+                    d[child] = tag * cw
+                    d[child + 1] = tag * cw
+                    if child < size:
+                        lz[child] = tag
+                        lz[child + 1] = tag
+                    lz[k] = None
+            if ((right >> i) << i) != right:
+                k = right >> i
+                tag = lz[k]
+                if tag is not None:
+                    child = 2 * k
+                    cw = 1 << (i - 1)
+                    d[child] = tag * cw
+                    d[child + 1] = tag * cw
+                    if child < size:
+                        lz[child] = tag
+                        lz[child + 1] = tag
+                    lz[k] = None
+
+        sml = smr = self._e
+        while left < right:
+            if left & 1:
+                a = d[left]
+                sml = sml + a
+                left += 1
+            if right & 1:
+                right -= 1
+                b = d[right]
+                smr = b + smr
+            left >>= 1
+            right >>= 1
+
+        return sml + smr
+
+    def apply(self, left: int, right: typing.Optional[int] = None,
+              f: typing.Optional[typing.Any] = None) -> None:
+        assert f is not None
+
+        d = self._d
+        lz = self._lz
+        size = self._size
+        if right is None:
+            assert 0 <= left < self._n
+
+            p = left + size
+            for i in range(self._log, 0, -1):
+                self._push(p >> i)
+            d[p] = f
+            for i in range(1, self._log + 1):
+                self._update(p >> i)
+            return
+
+        assert 0 <= left <= right <= self._n
+        if left == right:
+            return
+
+        left += size
+        right += size
+
+        for i in range(self._log, 0, -1):
+            if ((left >> i) << i) != left:
+                k = left >> i
+                tag = lz[k]
+                if tag is not None:
+                    child = 2 * k
+                    cw = 1 << (i - 1)
+                    d[child] = tag * cw
+                    d[child + 1] = tag * cw
+                    if child < size:
+                        lz[child] = tag
+                        lz[child + 1] = tag
+                    lz[k] = None
+            if ((right >> i) << i) != right:
+                k = (right - 1) >> i
+                tag = lz[k]
+                if tag is not None:
+                    child = 2 * k
+                    cw = 1 << (i - 1)
+                    d[child] = tag * cw
+                    d[child + 1] = tag * cw
+                    if child < size:
+                        lz[child] = tag
+                        lz[child + 1] = tag
+                    lz[k] = None
+
+        l2 = left
+        r2 = right
+        w = 1
+        while left < right:
+            if left & 1:
+                d[left] = f * w
+                if left < size:
+                    lz[left] = f
+                left += 1
+            if right & 1:
+                right -= 1
+                d[right] = f * w
+                if right < size:
+                    lz[right] = f
+            left >>= 1
+            right >>= 1
+            w <<= 1
+        left = l2
+        right = r2
+
+        for i in range(1, self._log + 1):
+            if ((left >> i) << i) != left:
+                k = left >> i
+                a = d[2 * k]
+                b = d[2 * k + 1]
+                d[k] = a + b
+            if ((right >> i) << i) != right:
+                k = (right - 1) >> i
+                a = d[2 * k]
+                b = d[2 * k + 1]
+                d[k] = a + b
+
+    def _push(self, k: int) -> None:
+        d = self._d
+        lz = self._lz
+        size = self._size
+        w = size >> k.bit_length()  # width of the children of k
+        tag = lz[k]
+        if tag is not None:
+            child = 2 * k
+            d[child] = tag * w
+            d[child + 1] = tag * w
+            if child < size:
+                lz[child] = tag
+                lz[child + 1] = tag
+            lz[k] = None
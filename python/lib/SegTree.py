@@ -1,4 +1,6 @@
+import operator
 import typing
+from math import gcd
 
 
 def _ceil_pow2(n: int) -> int:
@@ -78,6 +80,30 @@ class SegTree:
     def all_prod(self) -> typing.Any:
         return self._d[1]
 
+    def set_many(
+        self,
+        ps: typing.Iterable[int],
+        xs: typing.Iterable[typing.Any],
+    ) -> None:
+        """set(p, x) for every pair; each touched node is recomputed once."""
+        nodes = set()
+        for p, x in zip(ps, xs):
+            assert 0 <= p < self._n
+            self._d[p + self._size] = x
+            nodes.add((p + self._size) >> 1)
+        # All leaves are on the same level, so every set holds the nodes of one level
+        while nodes:
+            for k in nodes:
+                self._update(k)
+            nodes = {k >> 1 for k in nodes if k > 1}
+
+    def prod_many(
+        self,
+        lefts: typing.Iterable[int],
+        rights: typing.Iterable[int],
+    ) -> typing.List[typing.Any]:
+        return [self.prod(left, right) for left, right in zip(lefts, rights)]
+
     def max_right(
         self,
         left: int,
@@ -145,3 +171,508 @@ class SegTree:
         k: int,
     ) -> None:
         self._d[k] = self._op(self._d[2 * k], self._d[2 * k + 1])
+
+
+class _MonoidSegTree(SegTree):
+    """
+    SegTree for the fixed monoid of the class attributes _op and _identity; e defaults to _identity.
+    Subclasses override the hot methods with the operation written inline instead of called through
+    self._op; the other methods are SegTree's.  _op must be a builtin so it is not bound as a method.
+    """
+
+    _op: typing.Callable[[typing.Any, typing.Any], typing.Any]
+    _identity: typing.Any
+
+    def __init__(
+        self,
+        v: typing.Union[int, typing.List[typing.Any]],
+        e: typing.Any = None,
+    ) -> None:
+        self._e = self._identity if e is None else e
+
+        if isinstance(v, int):
+            v = [self._e] * v
+
+        self._n = len(v)
+        self._log = _ceil_pow2(self._n)
+        self._size = 1 << self._log
+        self._d = [self._e] * self._size + list(v) + [self._e] * (self._size - self._n)
+        self._build()
+
+    def _build(self) -> None:
+        # One level at a time with a C-level map
+        d = self._d
+        hi = self._size
+        while hi > 1:
+            lo = hi >> 1
+            d[lo:hi] = map(self._op, d[2 * lo : 2 * hi : 2], d[2 * lo + 1 : 2 * hi : 2])
+            hi = lo
+
+    def _set_leaves(
+        self,
+        ps: typing.Iterable[int],
+        xs: typing.Iterable[typing.Any],
+    ) -> typing.Set[int]:
+        """Leaves of set_many; returns the parents still to recompute, none when the tree was rebuilt."""
+        d = self._d
+        size = self._size
+        nodes = set()
+        for p, x in zip(ps, xs):
+            assert 0 <= p < self._n
+            d[p + size] = x
+            nodes.add((p + size) >> 1)
+        # A batch touching most of the tree is cheaper to rebuild level by level
+        if len(nodes) * self._log > size:
+            self._build()
+            return set()
+        return nodes
+
+
+class SumSegTree(_MonoidSegTree):
+    _op = operator.add
+    _identity = 0
+
+    def set(
+        self,
+        p: int,
+        x: typing.Any,
+    ) -> None:
+        assert 0 <= p < self._n
+
+        d = self._d
+        p += self._size
+        d[p] = x
+        p >>= 1
+        while p:
+            a = d[2 * p]
+            b = d[2 * p + 1]
+            d[p] = a + b
+            p >>= 1
+
+    def prod(
+        self,
+        left: int,
+        right: int,
+    ) -> typing.Any:
+        assert 0 <= left <= right <= self._n
+        d = self._d
+        sml = smr = self._e
+        left += self._size
+        right += self._size
+
+        while left < right:
+            if left & 1:
+                a = d[left]
+                sml = sml + a
+                left += 1
+            if right & 1:
+                right -= 1
+                b = d[right]
+                smr = b + smr
+            left >>= 1
+            right >>= 1
+
+        return sml + smr
+
+    def set_many(
+        self,
+        ps: typing.Iterable[int],
+        xs: typing.Iterable[typing.Any],
+    ) -> None:
+        d = self._d
+        nodes = self._set_leaves(ps, xs)
+        while nodes:
+            for k in nodes:
+                a = d[2 * k]
+                b = d[2 * k + 1]
+                d[k] = a + b
+            nodes = {k >> 1 for k in nodes if k > 1}
+
+    def prod_many(
+        self,
+        lefts: typing.Iterable[int],
+        rights: typing.Iterable[int],
+    ) -> typing.List[typing.Any]:
+        d = self._d
+        e = self._e
+        size = self._size
+        n = self._n
+        result = []
+        for left, right in zip(lefts, rights):
+            assert 0 <= left <= right <= n
+            sml = smr = e
+            left += size
+            right += size
+            while left < right:
+                if left & 1:
+                    a = d[left]
+                    sml = sml + a
+                    left += 1
+                if right & 1:
+                    right -= 1
+                    b = d[right]
+                    smr = b + smr
+                left >>= 1
+                right >>= 1
+            result.append(sml + smr)
+        return result
+
+
+class MinSegTree(_MonoidSegTree):
+    _op = min
+    _identity = float("inf")
+
+    def set(
+        self,
+        p: int,
+        x: typing.Any,
+    ) -> None:
+        assert 0 <= p < self._n
+
+        d = self._d
+        p += self._size
+        d[p] = x
+        p >>= 1
+        while p:
+            a = d[2 * p]
+            b = d[2 * p + 1]
+            d[p] = a if a < b else b
+            p >>= 1
+
+    def prod(
+        self,
+        left: int,
+        right: int,
+    ) -> typing.Any:
+        assert 0 <= left <= right <= self._n
+        d = self._d
+        sml = smr = self._e
+        left += self._size
+        right += self._size
+
+        while left < right:
+            if left & 1:
+                a = d[left]
+                sml = sml if sml < a else a
+                left += 1
+            if right & 1:
+                right -= 1
+                b = d[right]
+                smr = b if b < smr else smr
+            left >>= 1
+            right >>= 1
+
+        return sml if sml < smr else smr
+
+    def set_many(
+        self,
+        ps: typing.Iterable[int],
+        xs: typing.Iterable[typing.Any],
+    ) -> None:
+        d = self._d
+        nodes = self._set_leaves(ps, xs)
+        while nodes:
+            for k in nodes:
+                a = d[2 * k]
+                b = d[2 * k + 1]
+                d[k] = a if a < b else b
+            nodes = {k >> 1 for k in nodes if k > 1}
+
+    def prod_many(
+        self,
+        lefts: typing.Iterable[int],
+        rights: typing.Iterable[int],
+    ) -> typing.List[typing.Any]:
+        d = self._d
+        e = self._e
+        size = self._size
+        n = self._n
+        result = []
+        for left, right in zip(lefts, rights):
+            assert 0 <= left <= right <= n
+            sml = smr = e
+            left += size
+            right += size
+            while left < right:
+                if left & 1:
+                    a = d[left]
+                    sml = sml if sml < a else a
+                    left += 1
+                if right & 1:
+                    right -= 1
+                    b = d[right]
+                    smr = b if b < smr else smr
+                left >>= 1
+                right >>= 1
+            result.append(sml if sml < smr else smr)
+        return result
+
+
+class MaxSegTree(_MonoidSegTree):
+    _op = max
+    _identity = -float("inf")
+
+    def set(
+        self,
+        p: int,
+        x: typing.Any,
+    ) -> None:
+        assert 0 <= p < self._n
+
+        d = self._d
+        p += self._size
+        d[p] = x
+        p >>= 1
+        while p:
+            a = d[2 * p]
+            b = d[2 * p + 1]
+            d[p] = a if a > b else b
+            p >>= 1
+
+    def prod(
+        self,
+        left: int,
+        right: int,
+    ) -> typing.Any:
+        assert 0 <= left <= right <= self._n
+        d = self._d
+        sml = smr = self._e
+        left += self._size
+        right += self._size
+
+        while left < right:
+            if left & 1:
+                a = d[left]
+                sml = sml if sml > a else a
+                left += 1
+            if right & 1:
+                right -= 1
+                b = d[right]
+                smr = b if b > smr else smr
+            left >>= 1
+            right >>= 1
+
+        return sml if sml > smr else smr
+
+    def set_many(
+        self,
+        ps: typing.Iterable[int],
+        xs: typing.Iterable[typing.Any],
+    ) -> None:
+        d = self._d
+        nodes = self._set_leaves(ps, xs)
+        while nodes:
+            for k in nodes:
+                a = d[2 * k]
+                b = d[2 * k + 1]
+                d[k] = a if a > b else b
+            nodes = {k >> 1 for k in nodes if k > 1}
+
+    def prod_many(
+        self,
+        lefts: typing.Iterable[int],
+        rights: typing.Iterable[int],
+    ) -> typing.List[typing.Any]:
+        d = self._d
+        e = self._e
+        size = self._size
+        n = self._n
+        result = []
+        for left, right in zip(lefts, rights):
+            assert 0 <= left <= right <= n
+            sml = smr = e
+            left += size
+            right += size
+            while left < right:
+                if left & 1:
+                    a = d[left]
+                    sml = sml if sml > a else a
+                    left += 1
+                if right & 1:
+                    right -= 1
+                    b = d[right]
+                    smr = b if b > smr else smr
+                left >>= 1
+                right >>= 1
+            result.append(sml if sml > smr else smr)
+        return result
+
+
+class XorSegTree(_MonoidSegTree):
+    _op = operator.xor
+    _identity = 0
+
+    def set(
+        self,
+        p: int,
+        x: typing.Any,
+    ) -> None:
+        assert 0 <= p < self._n
+
+        d = self._d
+        p += self._size
+        d[p] = x
+        p >>= 1
+        while p:
+            a = d[2 * p]
+            b = d[2 * p + 1]
+            d[p] = a ^ b
+            p >>= 1
+
+    def prod(
+        self,
+        left: int,
+        right: int,
+    ) -> typing.Any:
+        assert 0 <= left <= right <= self._n
+        d = self._d
+        sml = smr = self._e
+        left += self._size
+        right += self._size
+
+        while left < right:
+            if left & 1:
+                a = d[left]
+                sml = sml ^ a
+                left += 1
+            if right & 1:
+                right -= 1
+                b = d[right]
+                smr = b ^ smr
+            left >>= 1
+            right >>= 1
+
+        return sml ^ smr
+
+    def set_many(
+        self,
+        ps: typing.Iterable[int],
+        xs: typing.Iterable[typing.Any],
+    ) -> None:
+        d = self._d
+        nodes = self._set_leaves(ps, xs)
+        while nodes:
+            for k in nodes:
+                a = d[2 * k]
+                b = d[2 * k + 1]
+                d[k] = a ^ b
+            nodes = {k >> 1 for k in nodes if k > 1}
+
+    def prod_many(
+        self,
+        lefts: typing.Iterable[int],
+        rights: typing.Iterable[int],
+    ) -> typing.List[typing.Any]:
+        d = self._d
+        e = self._e
+        size = self._size
+        n = self._n
+        result = []
+        for left, right in zip(lefts, rights):
+            assert 0 <= left <= right <= n
+            sml = smr = e
+            left += size
+            right += size
+            while left < right:
+                if left & 1:
+                    a = d[left]
+                    sml = sml ^ a
+                    left += 1
+                if right & 1:
+                    right -= 1
+                    b = d[right]
+                    smr = b ^ smr
+                left >>= 1
+                right >>= 1
+            result.append(sml ^ smr)
+        return result
+
+
+class GcdSegTree(_MonoidSegTree):
+    _op = gcd
+    _identity = 0
+
+    def set(
+        self,
+        p: int,
+        x: typing.Any,
+    ) -> None:
+        assert 0 <= p < self._n
+
+        d = self._d
+        p += self._size
+        d[p] = x
+        p >>= 1
+        while p:
+            a = d[2 * p]
+            b = d[2 * p + 1]
+            d[p] = gcd(a, b)
+            p >>= 1
+
+    def prod(
+        self,
+        left: int,
+        right: int,
+    ) -> typing.Any:
+        assert 0 <= left <= right <= self._n
+        d = self._d
+        sml = smr = self._e
+        left += self._size
+        right += self._size
+
+        while left < right:
+            if left & 1:
+                a = d[left]
+                sml = gcd(sml, a)
+                left += 1
+            if right & 1:
+                right -= 1
+                b = d[right]
+                smr = gcd(b, smr)
+            left >>= 1
+            right >>= 1
+
+        return gcd(sml, smr)
+
+    def set_many(
+        self,
+        ps: typing.Iterable[int],
+        xs: typing.Iterable[typing.Any],
+    ) -> None:
+        d = self._d
+        nodes = self._set_leaves(ps, xs)
+        while nodes:
+            for k in nodes:
+                a = d[2 * k]
+                b = d[2 * k + 1]
+                d[k] = gcd(a, b)
+            nodes = {k >> 1 for k in nodes if k > 1}
+
+    def prod_many(
+        self,
+        lefts: typing.Iterable[int],
+        rights: typing.Iterable[int],
+    ) -> typing.List[typing.Any]:
+        d = self._d
+        e = self._e
+        size = self._size
+        n = self._n
+        result = []
+        for left, right in zip(lefts, rights):
+            assert 0 <= left <= right <= n
+            sml = smr = e
+            left += size
+            right += size
+            while left < right:
+                if left & 1:
+                    a = d[left]
+                    sml = gcd(sml, a)
+                    left += 1
+                if right & 1:
+                    right -= 1
+                    b = d[right]
+                    smr = gcd(b, smr)
+                left >>= 1
+                right >>= 1
+            result.append(gcd(sml, smr))
+        return result
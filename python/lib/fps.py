@@ -0,0 +1,283 @@
+from lib.FFT import FFT, MOD, load_numpy
+
+# Formal power series mod 998244353 as coefficient lists, lowest degree first
+_fft = FFT(MOD)
+# fps_inv starts Newton's iteration from this many coefficients found term by term
+NAIVE_INV_SIZE = 32
+# Division by schoolbook long division while len(quotient) * len(divisor) is at most this
+NAIVE_DIVMOD_MAX_PRODUCT = 4096
+# multipoint_evaluation passes windows of at most this length down by plain convolution
+NAIVE_MIDDLE_PRODUCT_SIZE = 32
+# With numpy, product trees are built a whole level at a time up to nodes of this many points
+VECTOR_MAX_WIDTH = 64
+# _INV[i] = 1 / i mod MOD, grown on demand
+_INV = [0, 1]
+
+
+def _inverses(n):
+    while len(_INV) < n:
+        i = len(_INV)
+        _INV.append(-(MOD // i) * _INV[MOD % i] % MOD)
+    return _INV
+
+
+def _inverse_all(values):
+    # [1 / v for v in values] with a single pow, from prefix products
+    prefix = [1]
+    for v in values:
+        prefix.append(prefix[-1] * v % MOD)
+    inv = pow(prefix[-1], MOD - 2, MOD)
+    result = [0] * len(values)
+    for i in range(len(values) - 1, -1, -1):
+        result[i] = inv * prefix[i] % MOD
+        inv = inv * values[i] % MOD
+    return result
+
+
+def _derivative(f):
+    return [f[i] * i % MOD for i in range(1, len(f))]
+
+
+def _integral(f):
+    inv = _inverses(len(f) + 1)
+    return [0] + [f[i] * inv[i + 1] % MOD for i in range(len(f))]
+
+
+def _add(f, g):
+    if len(f) < len(g):
+        f, g = g, f
+    return [(x + y) % MOD for x, y in zip(f, g)] + f[len(g):]
+
+
+def fps_inv(f, n):
+    # g with f * g = 1 mod x**n; needs f[0] != 0
+    assert f and f[0] % MOD
+    k = min(n, NAIVE_INV_SIZE)
+    i0 = pow(f[0], MOD - 2, MOD)
+    g = [i0]
+    for i in range(1, k):
+        g.append(-sum(f[j] * g[i - j] for j in range(1, min(i + 1, len(f)))) * i0 % MOD)
+    while k < n:
+        # f * g = 1 + x**k * e mod x**(2k), so g - x**k * (g * e) is the inverse mod x**(2k).
+        # Both products are cyclic of length 2k: the wrap-around of f * g only reaches the low k
+        # coefficients, which are not used, and g * e has degree below 2k.  g is transformed once.
+        z = 2 * k
+        fg = _fft.transform(g, z)
+        e = _fft.cyclic_product(_fft.transform(f[:z], z), fg, z)[k:]
+        h = _fft.cyclic_product(_fft.transform(e, z), fg, z, k)
+        g += [-x % MOD for x in h]
+        k = z
+    return g[:n]
+
+
+def fps_log(f, n):
+    # log(f) mod x**n; needs f[0] == 1
+    assert f and f[0] % MOD == 1
+    if n <= 1:
+        return [0] * n
+    d = _fft.convolution(_derivative(f[:n]), fps_inv(f, n))[:n - 1]
+    return _integral(d + [0] * (n - 1 - len(d)))
+
+
+def fps_exp(f, n):
+    # exp(f) mod x**n; needs f[0] == 0
+    assert not f or f[0] % MOD == 0
+    g = [1]
+    k = 1
+    while k < n:
+        # Newton: g * (1 - log(g) + f) mod x**(2k)
+        k *= 2
+        h = fps_log(g, k)
+        t = [((f[i] if i < len(f) else 0) - h[i]) % MOD for i in range(k)]
+        t[0] = (t[0] + 1) % MOD
+        g = _fft.convolution(g, t)[:k]
+    return g[:n]
+
+
+def fps_pow(f, k, n):
+    # f**k mod x**n for an integer k >= 0
+    if n == 0:
+        return []
+    if k == 0:
+        return [1] + [0] * (n - 1)
+    d = next((i for i, x in enumerate(f) if x % MOD), None)
+    if d is None or d * k >= n:
+        return [0] * n
+    # f = c * x**d * g with g[0] == 1, so f**k = c**k * x**(dk) * exp(k * log(g))
+    m = n - d * k
+    c = f[d] % MOD
+    ic = pow(c, MOD - 2, MOD)
+    log_g = fps_log([x * ic % MOD for x in f[d:d + m]], m)
+    g = fps_exp([x * (k % MOD) % MOD for x in log_g], m)
+    ck = pow(c, k, MOD)
+    return [0] * (d * k) + [x * ck % MOD for x in g]
+
+
+def poly_divmod(f, g):
+    # (q, r) with f = g * q + r and len(r) == len(g) - 1; needs g[-1] != 0
+    assert g and g[-1] % MOD
+    n = len(f)
+    m = len(g)
+    if n < m:
+        return [], [x % MOD for x in f] + [0] * (m - 1 - n)
+    d = n - m + 1
+    if d * m <= NAIVE_DIVMOD_MAX_PRODUCT:
+        r = [x % MOD for x in f]
+        q = [0] * d
+        ilead = pow(g[-1], MOD - 2, MOD)
+        for i in range(d - 1, -1, -1):
+            c = r[i + m - 1] * ilead % MOD
+            q[i] = c
+            if c:
+                for j in range(m):
+                    r[i + j] = (r[i + j] - c * g[j]) % MOD
+        return q, r[:m - 1]
+    # The reversed quotient is reversed(f) / reversed(g) mod x**d
+    q = _fft.convolution(f[::-1][:d], fps_inv(g[::-1], d))[:d][::-1]
+    gq = _fft.convolution(g, q)
+    return q, [(x - y) % MOD for x, y in zip(f[:m - 1], gq)]
+
+
+def _pair_products(a, b):
+    # Row i is the product of the polynomials in rows i of the numpy arrays a and b
+    np = load_numpy()
+    c = np.zeros((a.shape[0], a.shape[1] + b.shape[1] - 1), dtype=np.int64)
+    for i in range(a.shape[1]):
+        c[:, i:i + b.shape[1]] = (c[:, i:i + b.shape[1]] + a[:, i:i + 1] * b % MOD) % MOD
+    return c
+
+
+def _vector_levels(n, size):
+    # (width, index of the first node, full nodes) for the levels built with _pair_products.  A
+    # node is full when all its points are real, so every full node of a level has the same degree.
+    levels = []
+    if load_numpy() is None:
+        return levels
+    width = 2
+    while width <= min(size, VECTOR_MAX_WIDTH):
+        levels.append((width, size // width, n // width))
+        width *= 2
+    return levels
+
+
+def _built(k, size, n, levels):
+    # Whether node k was built by one of levels
+    width = size >> (k.bit_length() - 1)
+    return bool(levels) and width <= levels[-1][0] and (k + 1) * width - size <= n
+
+
+def _subproduct_tree(xs):
+    # tree[size + i] = x - xs[i], tree[k] = tree[2k] * tree[2k + 1]; padding leaves are 1
+    n = len(xs)
+    size = 1 << (n - 1).bit_length()
+    tree = [[1]] * (2 * size)
+    for i, x in enumerate(xs):
+        tree[size + i] = [-x % MOD, 1]
+    levels = _vector_levels(n, size)
+    if levels:
+        np = load_numpy()
+        level = np.array(tree[size:size + n], dtype=np.int64)
+        for width, first, count in levels:
+            level = _pair_products(level[0:2 * count:2], level[1:2 * count:2])
+            tree[first:first + count] = level.tolist()
+    for k in range(size - 1, 0, -1):
+        if not _built(k, size, n, levels):
+            tree[k] = _fft.convolution(tree[2 * k], tree[2 * k + 1])
+    return size, tree
+
+
+def _evaluate(f, xs, size, tree):
+    # Transposed remainder tree: f(a) = [t**(m-1)] reversed(f) / (1 - a t) with m = len(f).  With
+    # D_S = prod(1 - a t) over the points S below a node (its tree entry reversed), the window of
+    # U_S = reversed(f) / D_S from t**(m-|S|) to t**(m-1) determines the windows of both children:
+    # U_left = U_S * D_right.  Only the root needs an inverse, and each window is transformed once
+    # for the products with both children.
+    n = len(xs)
+    m = max(len(f), n)
+    f = [x % MOD for x in f] + [0] * (m - len(f))
+    windows = [[]] * (2 * size)
+    windows[1] = _fft.convolution(f[::-1], fps_inv(tree[1][::-1], m))[m - n:m]
+    levels = _vector_levels(n, size)
+    for k in range(1, size):
+        if _built(k, size, n, levels):
+            continue
+        w = windows[k]
+        windows[k] = None
+        if not w:
+            continue
+        left = tree[2 * k][::-1]
+        right = tree[2 * k + 1][::-1]
+        s = len(w)
+        if s <= NAIVE_MIDDLE_PRODUCT_SIZE:
+            windows[2 * k] = _fft.convolution(w, right)[len(right) - 1:s]
+            windows[2 * k + 1] = _fft.convolution(w, left)[len(left) - 1:s]
+            continue
+        # Middle products: a cyclic length of at least s only wraps onto the unused low coefficients
+        z = 1 << (s - 1).bit_length()
+        fw = _fft.transform(w, z)
+        windows[2 * k] = _fft.cyclic_product(fw, _fft.transform(right, z), z, s)[len(right) - 1:]
+        windows[2 * k + 1] = _fft.cyclic_product(fw, _fft.transform(left, z), z, s)[len(left) - 1:]
+    if not levels:
+        return [windows[size + i][0] for i in range(n)]
+
+    # The full nodes of the vector levels, one level at a time
+    np = load_numpy()
+    rows = None
+    for width, first, count in reversed(levels):
+        rows = _full_rows(rows, windows, first, count, width)
+        half = width // 2
+        d = np.array(tree[2 * first:2 * first + 2 * count], dtype=np.int64)
+        d = d.reshape(2 * count, half + 1)[:, ::-1]
+        children = np.empty((2 * count, half), dtype=np.int64)
+        children[0::2] = _pair_products(rows, d[1::2])[:, half:width]
+        children[1::2] = _pair_products(rows, d[0::2])[:, half:width]
+        rows = children
+    return _full_rows(rows, windows, size, n, 1)[:, 0].tolist()
+
+
+def _full_rows(rows, windows, first, count, width):
+    # The windows of the count full nodes from first: rows holds those below full parents, the
+    # rest (at most one, below the partial node of the level above) are in windows
+    np = load_numpy()
+    have = 0 if rows is None else len(rows)
+    extra = np.array(windows[first + have:first + count], dtype=np.int64).reshape(count - have, width)
+    return extra if rows is None else np.concatenate([rows, extra])
+
+
+def multipoint_evaluation(f, xs):
+    # [f(x) for x in xs]
+    if not xs:
+        return []
+    return _evaluate(f, xs, *_subproduct_tree(xs))
+
+
+def interpolation(xs, ys):
+    # The polynomial of degree < len(xs) through every (xs[i], ys[i]); needs distinct xs mod MOD
+    assert len(xs) == len(ys)
+    if not xs:
+        return []
+    size, tree = _subproduct_tree(xs)
+    # Lagrange: sum of ys[i] / P'(xs[i]) * P / (x - xs[i]) with P = tree[1], summed up the tree
+    weights = _evaluate(_derivative(tree[1]), xs, size, tree)
+    coefficients = [y * w % MOD for y, w in zip(ys, _inverse_all(weights))]
+    n = len(xs)
+    num = [[]] * (2 * size)
+    for i, c in enumerate(coefficients):
+        num[size + i] = [c]
+    levels = _vector_levels(n, size)
+    if levels:
+        np = load_numpy()
+        level = np.array(coefficients, dtype=np.int64).reshape(n, 1)
+        for width, first, count in levels:
+            children = np.array(tree[2 * first:2 * first + 2 * count], dtype=np.int64)
+            children = children.reshape(2 * count, width // 2 + 1)
+            left = _pair_products(level[0:2 * count:2], children[1::2])
+            right = _pair_products(level[1:2 * count:2], children[0::2])
+            level = (left + right) % MOD
+            num[first:first + count] = level.tolist()
+    for k in range(size - 1, 0, -1):
+        if not _built(k, size, n, levels) and (num[2 * k] or num[2 * k + 1]):
+            left = _fft.convolution(num[2 * k], tree[2 * k + 1])
+            right = _fft.convolution(num[2 * k + 1], tree[2 * k])
+            num[k] = _add(left, right)
+    return (num[1] + [0] * n)[:n]
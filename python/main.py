@@ -2,11 +2,28 @@
 # created: 26.04.2025 15:00:00
 
 import copy
+import os
 import random
 import sys
 import time
 from collections import deque
-from typing import List, Optional, Tuple
+
+# -------------------- process start --------------------
+
+
+def process_start_time() -> float:
+    """perf_counter() value at process start; the judge's clock starts there, not when main() runs."""
+    try:
+        with open("/proc/self/stat") as f:
+            # starttime (field 22) in clock ticks since boot; count fields after the ")" closing comm
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        since_start = time.clock_gettime(time.CLOCK_BOOTTIME) - start_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return time.perf_counter()  # no procfs: fall back to import time
+    return time.perf_counter() - max(since_start, 0.0)
+
+
+PROCESS_START = process_start_time()
 
 # -------------------- constants --------------------
 N = 20
@@ -16,15 +33,39 @@ DIRS = {"U": (-1, 0), "D": (1, 0), "L": (0, -1), "R": (0, 1)}
 DIR_KEYS = list(DIRS)  # deterministic order
 INF = 10**9
 
+# -------------------- parameters --------------------
+# Local tuning can override these with SOLVER_PARAMS='{"seed": 1}'; the judge always uses the defaults.
+PARAMS = {
+    "seed": 42,
+    "phase_timeouts": [0.6, 1.2, 1.8],  # end of the d = 1, 2, 3 phases in seconds since process start
+    "time_scale": 1.0,  # multiplies phase_timeouts; raised by the runners along with the time limit when profiling
+}
+if "SOLVER_PARAMS" in os.environ:
+    import json  # only imported locally; json pulls in re and costs ~10 ms of startup
+
+    PARAMS.update(json.loads(os.environ["SOLVER_PARAMS"]))
+
+random.seed(PARAMS["seed"])
+
+# -------------------- result record --------------------
+
+
+def write_result(**record) -> None:
+    """Write one JSON record for the local runner; SOLVER_RESULT_PATH is never set on the judge."""
+    result_path = os.environ.get("SOLVER_RESULT_PATH")
+    if result_path:
+        import json
+
+        with open(result_path, "w") as f:
+            json.dump(record, f)
 
-random.seed(42)
 
 # -------------------- time keeper --------------------
 
 
 class TimeKeeper:
-    def __init__(self, timeout: float = 1.5):
-        self.start_time = time.perf_counter()
+    def __init__(self, timeout: float = 1.5, start_time: float | None = None):
+        self.start_time = time.perf_counter() if start_time is None else start_time
         self.timeout = timeout
 
     def elapsed_time(self):
@@ -53,14 +94,14 @@ class State:
         Number of destinations already visited.
     """
 
-    def __init__(self, N: int, start: Tuple[int, int], coords: List[Tuple[int, int]]):
+    def __init__(self, N: int, start: tuple[int, int], coords: list[tuple[int, int]]):
         self.N = N
         # False: empty, True: has block
         self.grid = [[False] * N for _ in range(N)]
         self.start = start
         self.pos = start
         self.coords = coords
-        self.actions: List[Tuple[str, str]] = []
+        self.actions: list[tuple[str, str]] = []
         self._visited = 0
 
     # ---------- convenience properties ----------
@@ -70,7 +111,7 @@ class State:
         return self._visited
 
     @property
-    def target(self) -> Optional[Tuple[int, int]]:
+    def target(self) -> tuple[int, int] | None:
         """Next destination cell, or None if all done."""
         return None if self._visited >= len(self.coords) else self.coords[self._visited]
 
@@ -137,7 +178,7 @@ class State:
 
 def recall_steps(
     state: State,
-) -> List["State"]:
+) -> list["State"]:
     """
     Recall the steps taken in the past and return a list of State objects.
     """
@@ -153,13 +194,36 @@ def recall_steps(
     return steps
 
 
+def load_initial_state(start: tuple[int, int], coords: list[tuple[int, int]]) -> State | None:
+    """
+    Replay a previous output named by SOLVER_INITIAL_PATH to warm-start the search.
+    Returns None when there is none or it is not a valid action sequence for this input.
+    """
+    initial_path = os.environ.get("SOLVER_INITIAL_PATH")
+    if not initial_path or not os.path.exists(initial_path):
+        return None
+    state = State(N, start, coords)
+    with open(initial_path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            parts = line.split()
+            if len(parts) != 2:
+                return None
+            act, dir = parts
+            if len(state.actions) >= MAX_ACTIONS or not state.can_apply(act, dir):
+                return None
+            state.apply_action(act, dir)
+    return state
+
+
 # -------------------- BFS helper --------------------
 def bfs_shortest(
-    grid: List[List[bool]],
+    grid: list[list[bool]],
     N: int,
-    start: Tuple[int, int],
-    target: Tuple[int, int],
-) -> Optional[List[Tuple[str, str]]]:
+    start: tuple[int, int],
+    target: tuple[int, int],
+) -> list[tuple[str, str]] | None:
     """Find shortest sequence of (act, dir) using only M and S from start to target."""
     if start == target:
         return []
@@ -209,57 +273,67 @@ def bfs_shortest(
     return None
 
 
-def main():
-    time_keeper1 = TimeKeeper(timeout=0.6)
-    time_keeper2 = TimeKeeper(timeout=1.2)
-    time_keeper3 = TimeKeeper(timeout=1.8)
-
-    input()  # skip
-    start = tuple(map(int, input().split()))
-    coords = [tuple(map(int, input().split())) for _ in range(M - 1)]
-
-    state = State(N, start, coords)
+# -------------------- search moves --------------------
+def greedy_route(state: State) -> State:
+    """Complete state in place with the shortest M/S path to each remaining destination in turn."""
     while not state.is_done():
         tgt = state.target
+        # handle already at target
         if state.pos == tgt:
             state._visited += 1
             continue
+
         path = bfs_shortest(state.grid, state.N, state.pos, tgt)
         if path is None:
-            break
-        for act, d in path:
-            state.apply_action(act, d)
+            break  # unreachable
+        for act, dir in path:
+            state.apply_action(act, dir)
             if len(state.actions) >= MAX_ACTIONS:
                 break
+        if len(state.actions) >= MAX_ACTIONS:
+            break
+    return state
+
+
+def candidate_state(steps: list[State], step: int, dir: str) -> State | None:
+    """Toggle a block next to steps[step] and re-route from there; None when no block fits there."""
+    state = copy.deepcopy(steps[step])
+    if not state.can_apply("A", dir):
+        return None
+    state.apply_action("A", dir)
+    return greedy_route(state)
+
+
+def main():
+    main_start = time.perf_counter() - PROCESS_START
+    timeouts = [t * PARAMS["time_scale"] for t in PARAMS["phase_timeouts"]]
+    time_keeper1 = TimeKeeper(timeout=timeouts[0], start_time=PROCESS_START)
+    time_keeper2 = TimeKeeper(timeout=timeouts[1], start_time=PROCESS_START)
+    time_keeper3 = TimeKeeper(timeout=timeouts[2], start_time=PROCESS_START)
+
+    input()  # skip
+    first_input = time.perf_counter() - PROCESS_START
+    start = tuple(map(int, input().split()))
+    coords = [tuple(map(int, input().split())) for _ in range(M - 1)]
 
+    # Resume from a previous output if given; the greedy route completes it if it is unfinished
+    state = greedy_route(load_initial_state(start, coords) or State(N, start, coords))
+
+    initial_score = state.calculate_score()
     steps = recall_steps(state)
+    candidates = []  # candidate states evaluated per phase
+    phase_times = []  # elapsed seconds at the end of each phase
 
     # d = 1
     states = [state]
     while not time_keeper1.is_timeout():
         dir = random.choice(DIR_KEYS)
         step = random.randint(0, len(steps) - 1)
-        state = copy.deepcopy(steps[step])
-
-        if state.can_apply("A", dir):
-            state.apply_action("A", dir)
-            while not state.is_done():
-                tgt = state.target
-                # handle already at target
-                if state.pos == tgt:
-                    state._visited += 1
-                    continue
-
-                path = bfs_shortest(state.grid, state.N, state.pos, tgt)
-                if path is None:
-                    break  # unreachable
-                for act, dir in path:
-                    state.apply_action(act, dir)
-                    if len(state.actions) >= MAX_ACTIONS:
-                        break
-                if len(state.actions) >= MAX_ACTIONS:
-                    break
+        state = candidate_state(steps, step, dir)
+        if state is not None:
             states.append(state)
+    candidates.append(len(states) - 1)
+    phase_times.append(time_keeper1.elapsed_time())
 
     best_state = max(states, key=lambda s: s.calculate_score())
     steps = recall_steps(best_state)
@@ -269,27 +343,11 @@ def main():
     while not time_keeper2.is_timeout():
         dir = random.choice(DIR_KEYS)
         step = random.randint(0, len(steps) - 1)
-        state = copy.deepcopy(steps[step])
-
-        if state.can_apply("A", dir):
-            state.apply_action("A", dir)
-            while not state.is_done():
-                tgt = state.target
-                # handle already at target
-                if state.pos == tgt:
-                    state._visited += 1
-                    continue
-
-                path = bfs_shortest(state.grid, state.N, state.pos, tgt)
-                if path is None:
-                    break  # unreachable
-                for act, dir in path:
-                    state.apply_action(act, dir)
-                    if len(state.actions) >= MAX_ACTIONS:
-                        break
-                if len(state.actions) >= MAX_ACTIONS:
-                    break
+        state = candidate_state(steps, step, dir)
+        if state is not None:
             states.append(state)
+    candidates.append(len(states) - 1)
+    phase_times.append(time_keeper1.elapsed_time())
 
     best_state = max(states, key=lambda s: s.calculate_score())
     steps = recall_steps(best_state)
@@ -299,27 +357,11 @@ def main():
     while not time_keeper3.is_timeout():
         dir = random.choice(DIR_KEYS)
         step = random.randint(0, len(steps) - 1)
-        state = copy.deepcopy(steps[step])
-
-        if state.can_apply("A", dir):
-            state.apply_action("A", dir)
-            while not state.is_done():
-                tgt = state.target
-                # handle already at target
-                if state.pos == tgt:
-                    state._visited += 1
-                    continue
-
-                path = bfs_shortest(state.grid, state.N, state.pos, tgt)
-                if path is None:
-                    break  # unreachable
-                for act, dir in path:
-                    state.apply_action(act, dir)
-                    if len(state.actions) >= MAX_ACTIONS:
-                        break
-                if len(state.actions) >= MAX_ACTIONS:
-                    break
+        state = candidate_state(steps, step, dir)
+        if state is not None:
             states.append(state)
+    candidates.append(len(states) - 1)
+    phase_times.append(time_keeper1.elapsed_time())
 
     best_state = max(states, key=lambda s: s.calculate_score())
 
@@ -327,6 +369,15 @@ def main():
 
     # 出力
     print(f"score {score}", file=sys.stderr)
+    write_result(
+        score=score,
+        initial_score=initial_score,
+        main_start=main_start,
+        first_input=first_input,
+        actions=len(best_state.actions),
+        candidates=candidates,
+        phase_times=phase_times,
+    )
     best_state.output_actions()
 
 
@@ -0,0 +1,149 @@
+import io
+import math
+import os
+import shutil
+import subprocess
+import tarfile
+from pathlib import Path
+from statistics import NormalDist, mean, stdev
+
+import click
+from joblib import Parallel, delayed
+
+import runner
+
+
+def resolve_variant(variant, label, workspace_dir):
+    """
+    Return (root, script path) for a solver file or a git revision of python/main.py; root holds the
+    python/lib the solver imports.  A revision is exported as its whole python/ tree, so its main.py
+    imports that revision's lib rather than failing on (or silently using) the working tree's.
+    """
+    path = Path(variant)
+    if path.is_file():
+        return workspace_dir, path
+    archive = subprocess.run(
+        ["git", "-C", workspace_dir, "archive", "--format=tar", variant, "python"],
+        capture_output=True,
+        check=True,
+    ).stdout
+    root = workspace_dir / "io" / "ab" / label / "src"
+    shutil.rmtree(root, ignore_errors=True)  # files of an earlier revision must not linger
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(root, filter="data")
+    return root, root / "python" / "main.py"
+
+
+def paired_interval(diffs, z):
+    m = mean(diffs)
+    half_width = z * stdev(diffs) / math.sqrt(len(diffs))
+    return m, m - half_width, m + half_width
+
+
+def submit_interleaved(case_nos, variants, workspace_dir, time_limit, core_queue, generate_input):
+    # Alternate which variant goes first so neither systematically gets the quieter machine
+    for i, case_no in enumerate(case_nos):
+        order = ("A", "B") if i % 2 == 0 else ("B", "A")
+        for label in order:
+            solver, cache, output_dir = variants[label]
+            yield delayed(run_variant)(
+                label,
+                case_no,
+                workspace_dir,
+                solver,
+                time_limit,
+                core_queue,
+                cache,
+                generate_input,
+                output_dir,
+            )
+
+
+def run_variant(label, *args):
+    return label, runner.run_case(*args)
+
+
+@click.command()
+@click.argument("variant_a")
+@click.argument("variant_b", default="python/main.py")
+@click.option("--start-case", default=0, show_default=True)
+@click.option("--end-case", default=99, show_default=True)
+@click.option("--time-limit", default=2.0, show_default=True, help="Per-case time limit in seconds.")
+@click.option("--confidence", default=0.95, show_default=True, help="Overall confidence across all looks.")
+@click.option("--min-pairs", default=20, show_default=True, help="Pairs to collect before the first look.")
+@click.option("--check-every", default=10, show_default=True, help="Pairs between looks.")
+@click.option("--negligible", default=0.002, show_default=True, help="Relative difference treated as no difference.")
+@click.option("--force", is_flag=True, help="Re-run every case even if a cached output exists.")
+@click.option("--generate", "generate_input", is_flag=True, help="Generate inputs from the case numbers as seeds.")
+def main(
+    variant_a,
+    variant_b,
+    start_case,
+    end_case,
+    time_limit,
+    confidence,
+    min_pairs,
+    check_every,
+    negligible,
+    force,
+    generate_input,
+):
+    workspace_dir = Path(os.getenv("WORKSPACE_DIR", "."))
+    case_nos = list(range(start_case, end_case + 1))
+
+    variants = {}
+    for label, variant in (("A", variant_a), ("B", variant_b)):
+        output_dir = workspace_dir / "io" / "ab" / label
+        (output_dir / "out").mkdir(parents=True, exist_ok=True)
+        (output_dir / "err").mkdir(parents=True, exist_ok=True)
+        root, script_path = resolve_variant(variant, label, workspace_dir)
+        solver = runner.python_solver(root, script_path)
+        variants[label] = (solver, runner.make_cache(workspace_dir, solver, time_limit, force), output_dir)
+        print(f" {label} \t:\t {variant} ({script_path})")
+
+    # Bonferroni over the scheduled looks keeps the overall error rate at 1 - confidence
+    looks = max(1, math.ceil((len(case_nos) - min_pairs) / check_every) + 1)
+    z = NormalDist().inv_cdf(1 - (1 - confidence) / looks / 2)
+
+    n_jobs, cores = runner.worker_cores(None, True)
+    pending = {}
+    scores_a = []
+    diffs = []
+    verdict = "unresolved"
+    with runner.core_pool(cores) as core_queue:
+        for label, result in Parallel(n_jobs=n_jobs, batch_size=1, return_as="generator_unordered")(
+            submit_interleaved(case_nos, variants, workspace_dir, time_limit, core_queue, generate_input)
+        ):
+            score = result["score"] if result["status"] == "OK" else 0
+            pending.setdefault(result["case_no"], {})[label] = score
+            if len(pending[result["case_no"]]) < 2:
+                continue
+            pair = pending.pop(result["case_no"])
+            scores_a.append(pair["A"])
+            diffs.append(pair["B"] - pair["A"])
+
+            n = len(diffs)
+            if n < min_pairs or (n - min_pairs) % check_every != 0:
+                continue
+            m, lo, hi = paired_interval(diffs, z)
+            scale = max(mean(scores_a), 1)
+            print(f" n={n:4d} \t B-A {m:+.2f} \t CI [{lo:+.2f}, {hi:+.2f}] \t rel {m / scale:+.3%}")
+            if lo > 0 or hi < 0:
+                verdict = "B is better" if lo > 0 else "A is better"
+                break
+            if -negligible * scale < lo and hi < negligible * scale:
+                verdict = "negligible difference"
+                break
+
+    print("###########################################")
+    if len(diffs) >= 2:
+        m, lo, hi = paired_interval(diffs, z)
+        print(f" Pairs \t\t:\t {len(diffs)} / {len(case_nos)}")
+        print(f" Mean B-A \t:\t {m:+.2f} (CI [{lo:+.2f}, {hi:+.2f}], z={z:.2f})")
+        print(f" Relative \t:\t {m / max(mean(scores_a), 1):+.3%}")
+    print(f" Verdict \t:\t {verdict}")
+    print("###########################################")
+
+
+if __name__ == "__main__":
+    main()
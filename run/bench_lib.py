@@ -0,0 +1,381 @@
+"""
+Scaling benchmarks for the python/lib data structures.
+
+    python3 bench_lib.py                                        # writes io/bench/lib.json
+    python3 bench_lib.py -k SegTree --sizes 1000,10000
+    python3 bench_lib.py --baseline io/bench/lib_baseline.json  # ops/sec ratios against a saved run
+
+Each benchmark builds its structure from seeded random data, then runs a fixed mix of
+operations; "size" is the input size (elements, vertices or matrix entries) and "ops" counts
+what the benchmark name says.  Every (benchmark, size) runs in a fresh interpreter so its peak
+RSS is its own.  Larger sizes are skipped once the predicted time exceeds --max-seconds, so
+quadratic and cubic structures stop at their practical maximum.  The scaling exponent is the
+least-squares slope of log(run time) over log(size): 1 is linear, about 1.1 is n log n.
+"""
+
+import importlib
+import json
+import math
+import operator
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import click
+
+SEED = 0
+DEFAULT_SIZES = "1000,10000,100000,1000000"
+INF = 10**18
+
+
+def load(module):
+    # python/lib is imported as the namespace package lib (lib/math.py must not shadow math)
+    return importlib.import_module(f"lib.{module}")
+
+
+def load_fft():
+    # FFT imports numpy on first use; import it here, with one small float convolution for numpy.fft's
+    # own first-call setup, so neither the ~100 ms nor the RSS of that lands in the timings
+    module = load("FFT")
+    if module.load_numpy() is not None:
+        module.FFT(module.MOD).convolution_float([1] * 32, [1] * 32)
+    return module
+
+
+def random_queries(rng, n, count):
+    queries = []
+    for _ in range(count):
+        left, right = sorted(rng.sample(range(n + 1), 2))
+        queries.append((left, right))
+    return queries
+
+
+def random_graph(rng, n, m):
+    return [(rng.randrange(n), rng.randrange(n), rng.randrange(1, 10**9)) for _ in range(m)]
+
+
+# Each benchmark takes (size, rng) and returns (build, run, ops): build() -> structure is timed
+# separately from run(structure), which performs ops operations.
+
+
+def bench_segtree(n, rng):
+    SegTree = load("SegTree").SegTree
+    values = [rng.randrange(10**9) for _ in range(n)]
+    updates = [(rng.randrange(n), rng.randrange(10**9)) for _ in range(n // 2)]
+    queries = random_queries(rng, n, n // 2)
+
+    def run(tree):
+        for p, x in updates:
+            tree.set(p, x)
+        for left, right in queries:
+            tree.prod(left, right)
+
+    return lambda: SegTree(operator.add, 0, values), run, len(updates) + len(queries)
+
+
+def bench_sum_segtree(n, rng):
+    # Same operations as bench_segtree on the specialized class, batched
+    SumSegTree = load("SegTree").SumSegTree
+    values = [rng.randrange(10**9) for _ in range(n)]
+    updates = [(rng.randrange(n), rng.randrange(10**9)) for _ in range(n // 2)]
+    lefts, rights = zip(*random_queries(rng, n, n // 2))
+
+    def run(tree):
+        tree.set_many(*zip(*updates))
+        tree.prod_many(lefts, rights)
+
+    return lambda: SumSegTree(values), run, len(updates) + len(lefts)
+
+
+def bench_lazy_segtree(n, rng):
+    LazySegTree = load("LazySegTree").LazySegTree
+    values = [rng.randrange(10**9) for _ in range(n)]
+    updates = [(*lr, rng.randrange(10**9)) for lr in random_queries(rng, n, n // 2)]
+    queries = random_queries(rng, n, n // 2)
+
+    def build():
+        # Range add, range min
+        return LazySegTree(min, INF, operator.add, operator.add, 0, values)
+
+    def run(tree):
+        for left, right, f in updates:
+            tree.apply(left, right, f)
+        for left, right in queries:
+            tree.prod(left, right)
+
+    return build, run, len(updates) + len(queries)
+
+
+def bench_add_min_lazy_segtree(n, rng):
+    # Same operations as bench_lazy_segtree on the specialized class
+    AddMinLazySegTree = load("LazySegTree").AddMinLazySegTree
+    values = [rng.randrange(10**9) for _ in range(n)]
+    updates = [(*lr, rng.randrange(10**9)) for lr in random_queries(rng, n, n // 2)]
+    queries = random_queries(rng, n, n // 2)
+
+    def run(tree):
+        for left, right, f in updates:
+            tree.apply(left, right, f)
+        for left, right in queries:
+            tree.prod(left, right)
+
+    return lambda: AddMinLazySegTree(values), run, len(updates) + len(queries)
+
+
+def bench_fenwick_tree(n, rng):
+    FenwickTree = load("FenwickTree").FenwickTree
+    updates = [(rng.randrange(1, n + 1), rng.randrange(10**9)) for _ in range(n // 2)]
+    queries = [rng.randrange(n + 1) for _ in range(n // 2)]
+
+    def run(tree):
+        for i, x in updates:
+            tree.add(i, x)
+        for i in queries:
+            tree.sum(i)
+
+    return lambda: FenwickTree(n), run, len(updates) + len(queries)
+
+
+def bench_dsu(n, rng):
+    DSU = load("DSU").DSU
+    merges = [(rng.randrange(n), rng.randrange(n)) for _ in range(n // 2)]
+    queries = [(rng.randrange(n), rng.randrange(n)) for _ in range(n // 2)]
+
+    def run(dsu):
+        for a, b in merges:
+            dsu.merge(a, b)
+        for a, b in queries:
+            dsu.same(a, b)
+
+    return lambda: DSU(n), run, len(merges) + len(queries)
+
+
+def bench_avltree(n, rng):
+    Avltree = load("Avltree").Avltree
+    keys = rng.sample(range(10 * n), n)
+    queries = [rng.randrange(10 * n) for _ in range(n)]
+
+    def build():
+        root = Avltree()
+        for key in keys:
+            root.insert(key)
+        return root
+
+    def run(root):
+        for key in queries:
+            root.search_lower(key, -1)
+
+    return build, run, len(queries)
+
+
+def bench_dijkstra(n, rng):
+    # n vertices, 4n directed edges; ops = vertices + edges
+    dijkstra = load("dijkstra").dijkstra
+    edges = random_graph(rng, n, 4 * n)
+
+    def build():
+        adj = [[] for _ in range(n)]
+        for u, v, cost in edges:
+            adj[u].append((cost, v))
+        return adj
+
+    return build, lambda adj: dijkstra(adj, 0), n + len(edges)
+
+
+def bench_warshall_floyd(n, rng):
+    # Size is the number of matrix entries, V * V; ops = V ** 3 relaxations
+    module = load("warshall_floyd")
+    v = math.isqrt(n)
+    costs = [[0 if i == j else rng.choice((module.INF, rng.randrange(1, 10**9))) for j in range(v)] for i in range(v)]
+
+    def build():
+        return [row[:] for row in costs]
+
+    return build, lambda cost: module.warshall_floyd(v, cost), v**3
+
+
+def bench_scc(n, rng):
+    # n vertices, 2n directed edges; ops = vertices + edges
+    SCC = load("SCC").SCC
+    edges = random_graph(rng, n, 2 * n)
+
+    def build():
+        scc = SCC(n)
+        for u, v, _ in edges:
+            scc.add_edge(u, v)
+        return scc
+
+    return build, lambda scc: scc.scc(), n + len(edges)
+
+
+def bench_convolution(method):
+    def bench(n, rng):
+        # Two length n/2 inputs; ops = output coefficients
+        module = load_fft()
+        a = [rng.randrange(module.MOD) for _ in range(n // 2)]
+        b = [rng.randrange(module.MOD) for _ in range(n - n // 2)]
+        return lambda: module.FFT(module.MOD), lambda fft: getattr(fft, method)(a, b), n
+
+    return bench
+
+
+def bench_convolution_any_mod(n, rng):
+    # As bench_convolution, mod 1e9+7 through the three NTT primes
+    module = load_fft()
+    mod = 10**9 + 7
+    a = [rng.randrange(mod) for _ in range(n // 2)]
+    b = [rng.randrange(mod) for _ in range(n - n // 2)]
+    return lambda: None, lambda _: module.convolution_any_mod(a, b, mod), n
+
+
+def bench_fps_exp(n, rng):
+    # exp of a length n series; ops = coefficients
+    load_fft()
+    module = load("fps")
+    f = [0] + [rng.randrange(module.MOD) for _ in range(n - 1)]
+    return lambda: None, lambda _: module.fps_exp(f, n), n
+
+
+def bench_multipoint_evaluation(n, rng):
+    # Degree n - 1 polynomial at n points; ops = points
+    load_fft()
+    module = load("fps")
+    f = [rng.randrange(module.MOD) for _ in range(n)]
+    xs = [rng.randrange(module.MOD) for _ in range(n)]
+    return lambda: None, lambda _: module.multipoint_evaluation(f, xs), n
+
+
+def bench_string(method):
+    def bench(n, rng):
+        string = load("string").string
+        s = [rng.randrange(26) for _ in range(n)]
+        if method == "lcp_array":
+            sa = string.suffix_array(s)
+            return lambda: None, lambda _: string.lcp_array(s, sa), n
+        return lambda: None, lambda _: getattr(string, method)(s), n
+
+    return bench
+
+
+BENCHMARKS = {
+    "SegTree set+prod": bench_segtree,
+    "SumSegTree set_many+prod_many": bench_sum_segtree,
+    "LazySegTree apply+prod": bench_lazy_segtree,
+    "AddMinLazySegTree apply+prod": bench_add_min_lazy_segtree,
+    "FenwickTree add+sum": bench_fenwick_tree,
+    "DSU merge+same": bench_dsu,
+    "Avltree search_lower": bench_avltree,
+    "dijkstra": bench_dijkstra,
+    "warshall_floyd": bench_warshall_floyd,
+    "SCC": bench_scc,
+    "FFT.convolution": bench_convolution("convolution"),
+    "FFT.convolution_ntt": bench_convolution("convolution_ntt"),
+    "FFT.convolution_any_mod": bench_convolution_any_mod,
+    "fps.fps_exp": bench_fps_exp,
+    "fps.multipoint_evaluation": bench_multipoint_evaluation,
+    "string.suffix_array": bench_string("suffix_array"),
+    "string.lcp_array": bench_string("lcp_array"),
+    "string.z_algorithm": bench_string("z_algorithm"),
+}
+
+
+def run_worker(name, n):
+    # One measurement in this process: build and run once, then report the RSS growth over setup
+    sys.setrecursionlimit(10**6)
+    build, run, ops = BENCHMARKS[name](n, random.Random(SEED))
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start_time = time.perf_counter()
+    structure = build()
+    built = time.perf_counter()
+    run(structure)
+    end_time = time.perf_counter()
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before
+    return {"build_s": built - start_time, "run_s": end_time - built, "ops": ops, "peak_mb": peak_kb / 1024}
+
+
+def measure(workspace_dir, name, n, repeat):
+    # Best of repeat runs, each in a fresh interpreter
+    runs = []
+    for _ in range(repeat):
+        completed = subprocess.run(
+            [sys.executable, __file__, "--worker", name, str(n)],
+            env={**os.environ, "PYTHONPATH": str(workspace_dir / "python")},
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        runs.append(json.loads(completed.stdout))
+    best = min(runs, key=lambda r: r["run_s"])
+    return {**best, "ops_per_sec": best["ops"] / best["run_s"], "peak_mb": max(r["peak_mb"] for r in runs)}
+
+
+def scaling_exponent(sizes):
+    points = [(math.log(n), math.log(r["run_s"])) for n, r in sizes.items() if r["run_s"] > 0]
+    if len(points) < 2:
+        return None
+    mx = sum(x for x, _ in points) / len(points)
+    my = sum(y for _, y in points) / len(points)
+    return sum((x - mx) * (y - my) for x, y in points) / sum((x - mx) ** 2 for x, _ in points)
+
+
+@click.command()
+@click.option("-k", "pattern", default=None, help="Only run benchmarks whose name contains this.")
+@click.option("--sizes", default=DEFAULT_SIZES, show_default=True, help="Comma-separated input sizes.")
+@click.option("--repeat", default=3, show_default=True, help="Runs per size; the fastest is kept.")
+@click.option("--max-seconds", default=20.0, show_default=True, help="Skip sizes predicted to take longer.")
+@click.option(
+    "--output", type=click.Path(dir_okay=False, path_type=Path), default=None, help="[default: io/bench/lib.json]"
+)
+@click.option("--baseline", type=click.Path(exists=True, dir_okay=False, path_type=Path), default=None)
+@click.option("--worker", nargs=2, default=None, hidden=True)
+def main(pattern, sizes, repeat, max_seconds, output, baseline, worker):
+    if worker is not None:
+        print(json.dumps(run_worker(worker[0], int(worker[1]))))
+        return
+
+    workspace_dir = Path(os.getenv("WORKSPACE_DIR", "."))
+    output = output or workspace_dir / "io" / "bench" / "lib.json"
+    sizes = sorted(int(size) for size in sizes.split(","))
+    base = None
+    if baseline is not None:
+        with baseline.open("r") as f:
+            base = json.load(f)["benchmarks"]
+
+    report = {"python": sys.version, "benchmarks": {}}
+    print(" Benchmark \t size \t build (ms) \t ops/s \t peak (MB) \t baseline")
+    for name in BENCHMARKS:
+        if pattern is not None and pattern not in name:
+            continue
+        results = {}
+        for n in sizes:
+            if results:
+                # Predict from the last size, at least linearly
+                last_n, last = list(results.items())[-1]
+                exponent = max(scaling_exponent(results) or 1.0, 1.0)
+                if (last["build_s"] + last["run_s"]) * (n / last_n) ** exponent > max_seconds:
+                    print(f" {name} \t {n} \t skipped (over {max_seconds:.0f} s)")
+                    continue
+            results[n] = measure(workspace_dir, name, n, repeat)
+            r = results[n]
+            line = f" {name} \t {n} \t {r['build_s'] * 1000:.1f} \t {r['ops_per_sec']:.0f} \t {r['peak_mb']:.1f}"
+            base_result = (base or {}).get(name, {}).get("sizes", {}).get(str(n))
+            if base_result is not None:
+                line += f" \t {r['ops_per_sec'] / base_result['ops_per_sec']:.2f}x"
+            print(line)
+        exponent = scaling_exponent(results)
+        report["benchmarks"][name] = {"sizes": results, "exponent": exponent}
+        if exponent is not None:
+            print(f" {name} \t scaling exponent \t {exponent:.2f}")
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with output.open("w") as f:
+        json.dump(report, f, indent=1)
+    print(f" Saved \t:\t {output}")
+
+
+if __name__ == "__main__":
+    main()
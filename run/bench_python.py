@@ -0,0 +1,236 @@
+"""
+Micro-benchmarks for the hot primitives of python/main.py.
+
+    python3 bench_python.py                                   # writes io/bench/latest.json
+    python3 bench_python.py --output io/bench/baseline.json   # save a baseline
+    python3 bench_python.py --baseline io/bench/baseline.json # flag regressions against it
+
+Every benchmark uses fixed seeded fixtures, so runs differ only by the solver and the machine.
+Each repeat runs the operation enough times to last at least --min-time seconds; ops/sec is
+reported as mean and relative standard deviation over the repeats.
+"""
+
+import copy
+import json
+import math
+import os
+import platform
+import random
+import runpy
+import sys
+import time
+from pathlib import Path
+from statistics import mean, stdev
+
+import click
+
+import generate
+import judge
+import runner
+
+INPUT_SEED = 0
+GRID_SEED = 1
+BLOCK_RATE = 0.1
+BFS_PAIRS = 32
+CANDIDATES = 16
+HISTORY_ACTIONS = 1600
+# Actions kept on the benchmark states before their history is cleared, so memory stays flat
+MAX_HISTORY = 1000
+
+
+def load_fixture():
+    _, _, coords = judge.parse_input(generate.generate_case(INPUT_SEED))
+    return coords[0], coords[1:]
+
+
+def greedy_state(solver, start, coords):
+    # The initial route of main()
+    return solver["greedy_route"](solver["State"](solver["N"], start, coords))
+
+
+def random_history_state(solver, start, coords, n_actions):
+    rng = random.Random(GRID_SEED)
+    state = solver["State"](solver["N"], start, coords)
+    while len(state.actions) < n_actions:
+        act, dir = rng.choice("MSA"), rng.choice(solver["DIR_KEYS"])
+        if state.can_apply(act, dir):
+            state.apply_action(act, dir)
+    return state
+
+
+def bench_bfs_shortest(solver):
+    n = solver["N"]
+    rng = random.Random(GRID_SEED)
+    grid = [[rng.random() < BLOCK_RATE for _ in range(n)] for _ in range(n)]
+    empty = [(i, j) for i in range(n) for j in range(n) if not grid[i][j]]
+    pairs = []
+    while len(pairs) < BFS_PAIRS:
+        start, target = rng.sample(empty, 2)
+        if solver["bfs_shortest"](grid, n, start, target) is not None:
+            pairs.append((start, target))
+
+    def op():
+        for start, target in pairs:
+            solver["bfs_shortest"](grid, n, start, target)
+
+    return op, len(pairs)
+
+
+def bench_apply_action(act, dirs):
+    def setup(solver):
+        # Middle of an empty grid: M moves one cell, S slides to the border and back
+        _, coords = load_fixture()
+        state = solver["State"](solver["N"], (solver["N"] // 2, solver["N"] // 2), coords)
+        index = 0
+
+        def op():
+            nonlocal index
+            state.apply_action(act, dirs[index])
+            index ^= 1
+            if len(state.actions) >= MAX_HISTORY:
+                state.actions.clear()
+
+        return op, 1
+
+    return setup
+
+
+def bench_deepcopy(solver):
+    state = greedy_state(solver, *load_fixture())
+    return lambda: copy.deepcopy(state), 1
+
+
+def bench_recall_steps(solver):
+    state = random_history_state(solver, *load_fixture(), HISTORY_ACTIONS)
+    return lambda: solver["recall_steps"](state), 1
+
+
+def bench_candidate(solver):
+    steps = solver["recall_steps"](greedy_state(solver, *load_fixture()))
+    rng = random.Random(GRID_SEED)
+    candidates = [(rng.randint(0, len(steps) - 1), rng.choice(solver["DIR_KEYS"])) for _ in range(CANDIDATES)]
+
+    def op():
+        # Iterations of the search loop in main(): toggle a block somewhere on the route, then re-route
+        for step, dir in candidates:
+            state = solver["candidate_state"](steps, step, dir)
+            if state is not None:
+                state.calculate_score()
+
+    return op, len(candidates)
+
+
+BENCHMARKS = {
+    "bfs_shortest": bench_bfs_shortest,
+    "apply_action M": bench_apply_action("M", ("U", "D")),
+    "apply_action S": bench_apply_action("S", ("L", "R")),
+    "apply_action A": bench_apply_action("A", ("U", "U")),
+    "deepcopy(State)": bench_deepcopy,
+    f"recall_steps ({HISTORY_ACTIONS} actions)": bench_recall_steps,
+    "candidate evaluation": bench_candidate,
+}
+
+
+def measure(op, batch, repeat, min_time):
+    # Like timeit's autorange: 1, 2, 5, 10, ... calls until one repeat lasts min_time.
+    # A call performs batch operations over a fixed fixture set, so every repeat does the same work.
+    # GC stays enabled since the solver runs with it.
+    number = 1
+    while True:
+        start_time = time.perf_counter()
+        for _ in range(number):
+            op()
+        elapsed = time.perf_counter() - start_time
+        if elapsed >= min_time:
+            break
+        number = number * 5 // 2 if str(number)[0] == "2" else number * 2
+    rates = [number * batch / elapsed]
+    for _ in range(repeat - 1):
+        start_time = time.perf_counter()
+        for _ in range(number):
+            op()
+        rates.append(number * batch / (time.perf_counter() - start_time))
+    return number, rates
+
+
+def summarize(number, rates):
+    ops = mean(rates)
+    sd = stdev(rates) if len(rates) > 1 else 0.0
+    return {"ops_per_sec": ops, "stdev": sd, "rel_stdev": sd / ops, "number": number, "repeats": rates}
+
+
+def format_rate(ops):
+    return f"{ops:.1f}" if ops >= 10 else f"{ops:.3f}"
+
+
+def compare(current, base, threshold):
+    # Slower by more than threshold and by more than twice the combined standard error
+    delta = current["ops_per_sec"] - base["ops_per_sec"]
+    error = math.sqrt(
+        current["stdev"] ** 2 / len(current["repeats"]) + base["stdev"] ** 2 / len(base["repeats"])
+    )
+    relative = delta / base["ops_per_sec"]
+    if abs(delta) <= 2 * error or abs(relative) <= threshold:
+        return relative, "same"
+    return relative, "faster" if delta > 0 else "REGRESSION"
+
+
+@click.command()
+@click.option("--solver", "script_path", type=click.Path(exists=True, dir_okay=False, path_type=Path), default=None)
+@click.option("-k", "pattern", default=None, help="Only run benchmarks whose name contains this.")
+@click.option("--repeat", default=7, show_default=True)
+@click.option("--min-time", default=0.2, show_default=True, help="Minimum seconds per repeat.")
+@click.option(
+    "--output", type=click.Path(dir_okay=False, path_type=Path), default=None, help="[default: io/bench/latest.json]"
+)
+@click.option("--baseline", type=click.Path(exists=True, dir_okay=False, path_type=Path), default=None)
+@click.option("--threshold", default=0.05, show_default=True, help="Relative slowdown reported as a regression.")
+def main(script_path, pattern, repeat, min_time, output, baseline, threshold):
+    workspace_dir = Path(os.getenv("WORKSPACE_DIR", "."))
+    script_path = script_path or workspace_dir / "python" / "main.py"
+    output = output or workspace_dir / "io" / "bench" / "latest.json"
+
+    # One core for the whole suite, as in the runners
+    core = runner.physical_cores()[0]
+    os.sched_setaffinity(0, {core})
+    solver = runpy.run_path(str(script_path), run_name="__bench__")
+
+    report = {
+        "solver": str(script_path),
+        "python": sys.version,
+        "machine": platform.machine(),
+        "calibration": runner.calibrate(core),
+        "benchmarks": {},
+    }
+    base = None
+    if baseline is not None:
+        with baseline.open("r") as f:
+            base = json.load(f)
+
+    print(f" Solver \t:\t {script_path}")
+    print(f" Calibration \t:\t {report['calibration']:.2f} Mloops/s")
+    print(" Benchmark \t ops/s \t ± \t baseline \t change")
+    regressions = []
+    for name, setup in BENCHMARKS.items():
+        if pattern is not None and pattern not in name:
+            continue
+        result = summarize(*measure(*setup(solver), repeat, min_time))
+        report["benchmarks"][name] = result
+        line = f" {name} \t {format_rate(result['ops_per_sec'])} \t {result['rel_stdev']:.1%}"
+        if base is not None and name in base["benchmarks"]:
+            relative, verdict = compare(result, base["benchmarks"][name], threshold)
+            line += f" \t {format_rate(base['benchmarks'][name]['ops_per_sec'])} \t {relative:+.1%} {verdict}"
+            if verdict == "REGRESSION":
+                regressions.append(name)
+        print(line)
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with output.open("w") as f:
+        json.dump(report, f, indent=1)
+    print(f" Saved \t:\t {output}")
+    if regressions:
+        raise click.ClickException(f"regressions: {', '.join(regressions)}")
+
+
+if __name__ == "__main__":
+    main()
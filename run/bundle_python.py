@@ -0,0 +1,293 @@
+"""
+Bundle python/main.py and the python/lib code it uses into one submission file.
+
+    from lib.SegTree import SegTree      # in python/main.py (python/lib is the namespace package lib)
+    python3 bundle_python.py             # writes io/submission.py
+
+Every `from lib.<module> import ...` in the solver is replaced by the top-level definitions of
+python/lib/<module>.py reachable from the imported names (following other lib imports too).
+Inlined code loses its docstrings and annotations, so imports used only in annotations (typing)
+are dropped as well.  A used module's other top-level statements, e.g. sys.setrecursionlimit,
+are kept; `if __name__ == "__main__":` blocks are not.  The solver itself is copied verbatim.
+"""
+
+import ast
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+import click
+
+LIB_PACKAGE = "lib"
+# compile() and exec() of the module body, as on the judge before main() runs
+TIMING_SNIPPET = """
+import sys, time
+start = time.perf_counter()
+code = compile(open(sys.argv[1]).read(), sys.argv[1], "exec")
+compiled = time.perf_counter()
+exec(code, {"__name__": "__bundle__"})
+print(compiled - start, time.perf_counter() - compiled)
+"""
+
+
+class Stripper(ast.NodeTransformer):
+    """Remove docstrings and annotations."""
+
+    def strip_docstring(self, node):
+        body = node.body
+        if body and isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant):
+            if isinstance(body[0].value.value, str):
+                node.body = body[1:] or [ast.Pass()]
+        return node
+
+    def visit_FunctionDef(self, node):
+        self.generic_visit(node)
+        node.returns = None
+        for arg in [*node.args.posonlyargs, *node.args.args, *node.args.kwonlyargs, node.args.vararg, node.args.kwarg]:
+            if arg is not None:
+                arg.annotation = None
+        return self.strip_docstring(node)
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_ClassDef(self, node):
+        self.generic_visit(node)
+        return self.strip_docstring(node)
+
+    def visit_AnnAssign(self, node):
+        if node.value is None:
+            return None
+        return ast.Assign(targets=[node.target], value=node.value, lineno=node.lineno)
+
+    def generic_visit(self, node):
+        super().generic_visit(node)
+        # A body emptied by dropping bare annotations still needs a statement
+        if getattr(node, "body", None) == []:
+            node.body = [ast.Pass()]
+        return node
+
+
+def lib_module(node):
+    # "lib.SegTree" -> "SegTree" for `from lib.SegTree import ...`, else None
+    if isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+        package, _, module = node.module.partition(".")
+        if package == LIB_PACKAGE and module:
+            return module
+    return None
+
+
+def is_main_guard(node):
+    return (
+        isinstance(node, ast.If)
+        and isinstance(node.test, ast.Compare)
+        and isinstance(node.test.left, ast.Name)
+        and node.test.left.id == "__name__"
+    )
+
+
+def bound_names(node):
+    """Names a top-level statement binds; empty for statements run only for their effect."""
+    if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+        return [node.name]
+    if isinstance(node, (ast.Import, ast.ImportFrom)):
+        return [alias.asname or alias.name.split(".")[0] for alias in node.names]
+    if isinstance(node, (ast.Assign, ast.AnnAssign, ast.AugAssign)):
+        targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+        return [n.id for target in targets for n in ast.walk(target) if isinstance(n, ast.Name)]
+    return []
+
+
+def referenced_names(node):
+    return {n.id for n in ast.walk(node) if isinstance(n, ast.Name) and not isinstance(n.ctx, ast.Store)}
+
+
+class LibModule:
+    def __init__(self, name, path):
+        self.name = name
+        self.source = path.read_text()
+        tree = Stripper().visit(ast.parse(self.source, str(path)))
+        self.bindings = {}  # name -> statement index, or (lib module, name) for lib imports
+        self.statements = []
+        self.prelude = []  # indices of statements run whenever the module is used
+        for node in tree.body:
+            if is_main_guard(node) or (isinstance(node, ast.Expr) and isinstance(node.value, ast.Constant)):
+                continue
+            index = len(self.statements)
+            self.statements.append(node)
+            if lib_module(node) is not None:
+                for alias in node.names:
+                    self.bindings[alias.asname or alias.name] = (lib_module(node), alias.name)
+            elif bound_names(node):
+                for name in bound_names(node):
+                    self.bindings[name] = index
+            else:
+                self.prelude.append(index)
+
+
+class Bundler:
+    def __init__(self, lib_dir):
+        self.lib_dir = lib_dir
+        self.modules = {}
+        self.used = {}  # module -> set of statement indices
+        self.depends = {}  # module -> lib modules it imports from
+
+    def module(self, name):
+        if name not in self.modules:
+            path = self.lib_dir / f"{name}.py"
+            if not path.exists():
+                raise click.ClickException(f"{LIB_PACKAGE}.{name}: no such file {path}")
+            self.modules[name] = LibModule(name, path)
+        return self.modules[name]
+
+    def require(self, module_name, name):
+        module = self.module(module_name)
+        if module_name not in self.used:
+            self.used[module_name] = set()
+            self.depends[module_name] = set()
+            for index in module.prelude:
+                self.use(module, index)
+        binding = module.bindings.get(name)
+        if binding is None:
+            raise click.ClickException(f"{LIB_PACKAGE}.{module_name} has no top-level name {name}")
+        if isinstance(binding, tuple):
+            self.require(*binding)
+        else:
+            self.use(module, binding)
+
+    def use(self, module, index):
+        if index in self.used[module.name]:
+            return
+        self.used[module.name].add(index)
+        for name in referenced_names(module.statements[index]):
+            binding = module.bindings.get(name)
+            if isinstance(binding, tuple):
+                self.depends[module.name].add(binding[0])
+                self.require(*binding)
+            elif binding is not None:
+                self.use(module, binding)
+
+    def order(self):
+        # Dependencies before dependents, so module-level code never sees an undefined name
+        order = []
+        visiting = set()
+
+        def visit(module_name):
+            if module_name in visiting:
+                return  # already placed, or an import cycle
+            visiting.add(module_name)
+            for dependency in sorted(self.depends[module_name]):
+                visit(dependency)
+            order.append(module_name)
+
+        for module_name in self.used:
+            visit(module_name)
+        return order
+
+    def emit(self, reserved):
+        # Identical definitions shared by modules (e.g. _ceil_pow2) appear once
+        imports, definitions = [], []
+        seen = {}
+        for module_name in self.order():
+            module = self.modules[module_name]
+            for index in sorted(self.used[module_name]):
+                node = module.statements[index]
+                if lib_module(node) is not None:
+                    continue
+                code = ast.unparse(node)
+                names = bound_names(node)
+                for name in names:
+                    if name in reserved:
+                        raise click.ClickException(f"{LIB_PACKAGE}.{module_name}.{name} collides with the solver")
+                    if name in seen and seen[name][1] != code:
+                        first, second = f"{LIB_PACKAGE}.{seen[name][0]}", f"{LIB_PACKAGE}.{module_name}"
+                        raise click.ClickException(f"{name} is defined differently in {first} and {second}")
+                if code in (c for _, c in seen.values()) or code in imports:
+                    continue
+                for name in names:
+                    seen[name] = (module_name, code)
+                (imports if isinstance(node, (ast.Import, ast.ImportFrom)) else definitions).append(code)
+        return imports, definitions
+
+
+def bundle(script_path, lib_dir):
+    """Return the single-file submission and {lib module: statements kept from it}."""
+    solver_source = script_path.read_text()
+    tree = ast.parse(solver_source, str(script_path))
+    lib_imports = [node for node in tree.body if lib_module(node) is not None]
+    if not lib_imports:
+        return solver_source, {}
+
+    bundler = Bundler(lib_dir)
+    aliases = []
+    for node in lib_imports:
+        for alias in node.names:
+            bundler.require(lib_module(node), alias.name)
+            if alias.asname and alias.asname != alias.name:
+                aliases.append(f"{alias.asname} = {alias.name}")
+    # The solver's own imports may repeat the library's; any other name clash is an error
+    reserved = {
+        name for node in tree.body if not isinstance(node, (ast.Import, ast.ImportFrom)) for name in bound_names(node)
+    }
+    imports, definitions = bundler.emit(reserved)
+    block = [f"# -------------------- inlined from python/{LIB_PACKAGE} --------------------"]
+    block += imports + [""] + ["\n" + code + "\n" for code in definitions] + aliases
+    block.append(f"# -------------------- end of python/{LIB_PACKAGE} --------------------")
+
+    lines = solver_source.splitlines()
+    first = lib_imports[0]
+    drop = {i for node in lib_imports for i in range(node.lineno - 1, node.end_lineno)}
+    out = []
+    for i, line in enumerate(lines):
+        if i == first.lineno - 1:
+            out.append("\n".join(block))
+        if i not in drop:
+            out.append(line)
+
+    kept = {name: [bundler.modules[name].statements[i] for i in sorted(bundler.used[name])] for name in bundler.order()}
+    return "\n".join(out) + "\n", kept
+
+
+@click.command()
+@click.option("--solver", "script_path", type=click.Path(exists=True, dir_okay=False, path_type=Path), default=None)
+@click.option(
+    "--output", type=click.Path(dir_okay=False, path_type=Path), default=None, help="[default: io/submission.py]"
+)
+@click.option("--runs", default=5, show_default=True, help="Runs for the compile and import time.")
+def main(script_path, output, runs):
+    workspace_dir = Path(os.getenv("WORKSPACE_DIR", "."))
+    script_path = script_path or workspace_dir / "python" / "main.py"
+    output = output or workspace_dir / "io" / "submission.py"
+    lib_dir = workspace_dir / "python" / LIB_PACKAGE
+
+    source, kept = bundle(script_path, lib_dir)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(source)
+
+    timings = []
+    for _ in range(runs):
+        completed = subprocess.run(
+            [sys.executable, "-c", TIMING_SNIPPET, output],
+            env={key: value for key, value in os.environ.items() if key != "SOLVER_PARAMS"},
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        timings.append(tuple(map(float, completed.stdout.split())))
+
+    print("###########################################")
+    print(f" Solver \t:\t {script_path} ({len(script_path.read_bytes())} bytes)")
+    for name, statements in kept.items():
+        total = len(ast.parse((lib_dir / f"{name}.py").read_text()).body)
+        names = ", ".join(n for node in statements for n in bound_names(node)) or "-"
+        print(f"  {LIB_PACKAGE}.{name} \t:\t {names} ({len(statements)} of {total} top-level statements)")
+    print(f" Submission \t:\t {output}")
+    print(f"  Size \t:\t {len(source.encode())} bytes, {source.count(chr(10))} lines")
+    print(f"  Compile \t:\t {statistics.mean(t[0] for t in timings) * 1000:.2f} ms")
+    print(f"  Import \t:\t {statistics.mean(t[1] for t in timings) * 1000:.2f} ms (module body, without main())")
+    print("###########################################")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,346 @@
+"""
+Spread a multi-case run over several machines.
+
+    python3 distributed.py coordinator 0 99 --language cpp --host 0.0.0.0 --port 5555
+    RUNNER_TOKEN=<token> python3 distributed.py worker --host <coordinator host> --port 5555 --n-jobs 8
+
+Workers must present the coordinator's token (--token or RUNNER_TOKEN); without one the
+coordinator makes up a random token and prints it.
+
+The coordinator ships the solver sources, the parameters and every input over TCP (one JSON
+message per line), so a worker only needs this directory and a compiler for C++. Workers pull
+one case at a time and push back the result with its output; the case of a worker that drops
+its connection or overruns its lease is queued again. Outputs land in io/out and io/err as
+with multi_run_*.py, and the run is recorded in io/results.sqlite3.
+"""
+
+import collections
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import socket
+import socketserver
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import click
+from tqdm.auto import tqdm
+
+import generate
+import results_db
+import runner
+
+# Seconds a worker waits before asking again while the last cases are still in flight elsewhere
+WAIT_INTERVAL = 0.5
+# A worker holding a case for longer than time_limit * LEASE_FACTOR + LEASE_MARGIN is presumed dead
+LEASE_FACTOR = 2
+LEASE_MARGIN = 30
+
+
+def send(f, message):
+    f.write(json.dumps(message).encode() + b"\n")
+    f.flush()
+
+
+def recv(f):
+    # None once the peer has gone away
+    line = f.readline()
+    return json.loads(line) if line else None
+
+
+class Coordinator:
+    def __init__(self, case_nos, inputs, job, lease, token):
+        self.inputs = inputs
+        self.job = job
+        self.lease = lease
+        self.token = token
+        self.lock = threading.Lock()
+        self.pending = collections.deque(case_nos)
+        self.total = len(case_nos)
+        self.results = {}
+        self.outputs = {}
+        self.calibration = []
+        self.requeued = 0
+        self.connected = 0
+        self.finished = threading.Event()
+        self.progress = tqdm(total=self.total, smoothing=0, desc="Cases")
+
+    def take(self):
+        with self.lock:
+            return self.pending.popleft() if self.pending else None
+
+    def requeue(self, case_no, worker):
+        with self.lock:
+            if case_no in self.results:
+                return
+            # Front of the queue: it is already late
+            self.pending.appendleft(case_no)
+            self.requeued += 1
+        tqdm.write(f"Case {case_no:04d} \t re-queued ({worker} failed)")
+
+    def complete(self, result, output, error, worker):
+        with self.lock:
+            # A re-queued case can come back twice; the first result wins
+            if result["case_no"] in self.results:
+                return
+            self.results[result["case_no"]] = {**result, "worker": worker}
+            self.outputs[result["case_no"]] = (output, error)
+            self.progress.update()
+            if len(self.results) == self.total:
+                self.finished.set()
+        tqdm.write(f"{runner.format_result(result)} \t {worker}")
+
+
+class WorkerHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        coordinator = self.server.coordinator
+        hello = recv(self.rfile)
+        if hello is None:
+            return
+        if not hmac.compare_digest(hello.get("token", ""), coordinator.token):
+            send(self.wfile, {"type": "error", "message": "invalid token"})
+            return
+        worker = f"{hello['worker']}@{self.client_address[0]}"
+        with coordinator.lock:
+            coordinator.calibration.append(hello["calibration"])
+            coordinator.connected += 1
+
+        case_no = None
+        try:
+            send(self.wfile, {"type": "job", **coordinator.job})
+            while True:
+                message = recv(self.rfile)
+                if message is None:
+                    break
+                if message["type"] == "result":
+                    coordinator.complete(message["result"], message["output"], message["error"], worker)
+                    case_no = None
+
+                case_no = coordinator.take()
+                if case_no is not None:
+                    self.request.settimeout(coordinator.lease)
+                    send(self.wfile, {"type": "case", "case_no": case_no, "input": coordinator.inputs[case_no]})
+                elif coordinator.finished.is_set():
+                    send(self.wfile, {"type": "done"})
+                    break
+                else:
+                    self.request.settimeout(None)
+                    send(self.wfile, {"type": "wait"})
+        except (OSError, ValueError):
+            pass  # timed out or the connection broke; handled below
+        finally:
+            if case_no is not None:
+                coordinator.requeue(case_no, worker)
+            with coordinator.lock:
+                coordinator.connected -= 1
+
+
+class CoordinatorServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+def solver_job(workspace_dir, solver, time_limit):
+    # Everything a worker needs to rebuild the solver in its own directory
+    files = {path.relative_to(workspace_dir).as_posix(): path.read_text() for path in solver.cache_paths}
+    job = {"language": solver.language, "files": files, "params": solver.params, "time_limit": time_limit}
+    job["job_id"] = hashlib.sha256(json.dumps(job, sort_keys=True).encode()).hexdigest()[:16]
+    return job
+
+
+@click.group()
+def main():
+    pass
+
+
+@main.command()
+@click.argument("start_case", default=0)
+@click.argument("end_case", default=99)
+@click.option("--language", type=click.Choice(["python", "cpp"]), default="python", show_default=True)
+@click.option("--params", default="{}", show_default=True, help="Python solver parameters as JSON (SOLVER_PARAMS).")
+@click.option("--host", default="127.0.0.1", show_default=True, help="Address to listen on; 0.0.0.0 for other hosts.")
+@click.option("--port", default=5555, show_default=True, help="0 picks a free port.")
+@click.option(
+    "--token", envvar="RUNNER_TOKEN", default="", help="Shared secret workers must present.  [default: a random one]"
+)
+@click.option("--time-limit", default=2.0, show_default=True, help="Per-case time limit in seconds.")
+@click.option("--local-workers", default=0, show_default=True, help="Worker processes to start on this host.")
+@click.option("--baseline", type=int, default=None, help="Run ID to print per-case deltas against.")
+@click.option("--generate", "generate_input", is_flag=True, help="Generate inputs from the case numbers as seeds.")
+def coordinator(
+    start_case,
+    end_case,
+    language,
+    params,
+    host,
+    port,
+    token,
+    time_limit,
+    local_workers,
+    baseline,
+    generate_input,
+):
+    workspace_dir = Path(os.getenv("WORKSPACE_DIR", "."))
+    # Workers run whatever code the coordinator sends, so an empty token must not admit anyone
+    if not token:
+        token = secrets.token_hex(16)
+        tqdm.write(f"Token for the workers: RUNNER_TOKEN={token}")
+    if language == "python":
+        solver = runner.python_solver(workspace_dir, params=json.loads(params))
+    else:
+        # Build once here so a broken solver fails before any worker connects
+        solver = runner.cpp_solver(workspace_dir)
+
+    timings_path = workspace_dir / "io" / f"timings_{solver.language}.json"
+    timings = runner.load_timings(timings_path)
+    case_nos = runner.schedule_cases(list(range(start_case, end_case + 1)), timings)
+    inputs = {
+        case_no: (
+            generate.generate_case(case_no)
+            if generate_input
+            else (workspace_dir / "io" / "in" / f"{case_no:04d}.txt").read_text()
+        )
+        for case_no in case_nos
+    }
+
+    state = Coordinator(
+        case_nos,
+        inputs,
+        solver_job(workspace_dir, solver, time_limit),
+        time_limit * LEASE_FACTOR + LEASE_MARGIN,
+        token,
+    )
+    server = CoordinatorServer((host, port), WorkerHandler)
+    server.coordinator = state
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+    tqdm.write(f"Coordinator listening on {host}:{port} ({len(case_nos)} cases)")
+
+    # Workers started here are ordinary workers that happen to share the host.  Each runs one case
+    # at a time; pinned, every one of them would take the same first core.
+    command = [sys.executable, __file__, "worker", "--host", "127.0.0.1", "--port", str(port)]
+    workers = [
+        subprocess.Popen([*command, "--n-jobs", "1", "--no-pin"], env={**os.environ, "RUNNER_TOKEN": token})
+        for _ in range(local_workers)
+    ]
+    while not state.finished.wait(WAIT_INTERVAL):
+        # With no worker left to finish the run (e.g. the local ones were rejected), waiting would never end
+        if workers and all(worker.poll() is not None for worker in workers) and state.connected == 0:
+            server.shutdown()
+            state.progress.close()
+            raise click.ClickException(f"Every local worker exited with {len(state.results)}/{state.total} cases done")
+    server.shutdown()
+    state.progress.close()
+    for worker in workers:
+        worker.wait()
+
+    for case_no, (output, error) in state.outputs.items():
+        (workspace_dir / "io" / "out" / f"{case_no:04d}.txt").write_text(output)
+        (workspace_dir / "io" / "err" / f"{case_no:04d}.txt").write_text(error)
+    results = [state.results[case_no] for case_no in sorted(state.results)]
+    runner.save_timings(timings_path, timings, results)
+
+    total_score = sum(int(r["score"]) for r in results if r["status"] == "OK")
+    runner.print_summary(total_score, results, state.calibration)
+    print(" Workers:")
+    for worker, count in sorted(collections.Counter(r["worker"] for r in results).items()):
+        print(f"  {worker} \t:\t {count} cases")
+    print(f"  Re-queued \t:\t {state.requeued} cases")
+
+    con = results_db.connect(workspace_dir / "io" / "results.sqlite3")
+    run_id = results_db.record_run(
+        con, solver.language, results_db.source_hash(solver.source_path), total_score, results
+    )
+    print(f" Run ID \t:\t {run_id}")
+    if baseline is not None:
+        results_db.print_diff(results, *results_db.load_run(con, baseline))
+
+
+def prepare_solver(work_dir, job, solvers, lock):
+    # Threads of one worker share the unpacked sources and the build
+    with lock:
+        if job["job_id"] not in solvers:
+            job_dir = work_dir / job["job_id"]
+            for name, text in job["files"].items():
+                (job_dir / name).parent.mkdir(parents=True, exist_ok=True)
+                (job_dir / name).write_text(text)
+            for name in ("in", "out", "err"):
+                (job_dir / "io" / name).mkdir(parents=True, exist_ok=True)
+            if job["language"] == "python":
+                solver = runner.python_solver(job_dir, params=job["params"])
+            else:
+                solver = runner.cpp_solver(job_dir)
+            solvers[job["job_id"]] = (job_dir, solver)
+        return solvers[job["job_id"]]
+
+
+def work(host, port, token, name, work_dir, core_queue, solvers, lock):
+    with runner.pinned_core(core_queue) as core:
+        calibration = runner.calibrate(core)
+    with socket.create_connection((host, port)) as sock, sock.makefile("rwb") as f:
+        send(f, {"type": "hello", "token": token, "worker": name, "calibration": calibration})
+        job = recv(f)
+        if job is None or job["type"] == "error":
+            raise click.ClickException(f"{name}: rejected by the coordinator ({job and job['message']})")
+        job_dir, solver = prepare_solver(work_dir, job, solvers, lock)
+
+        send(f, {"type": "ready"})
+        while (message := recv(f)) is not None and message["type"] != "done":
+            if message["type"] == "wait":
+                time.sleep(WAIT_INTERVAL)
+                send(f, {"type": "ready"})
+                continue
+            case_no = message["case_no"]
+            (job_dir / "io" / "in" / f"{case_no:04d}.txt").write_text(message["input"])
+            result = runner.run_case(case_no, job_dir, solver, job["time_limit"], core_queue)
+            send(
+                f,
+                {
+                    "type": "result",
+                    "result": result,
+                    "output": (job_dir / "io" / "out" / f"{case_no:04d}.txt").read_text(),
+                    "error": (job_dir / "io" / "err" / f"{case_no:04d}.txt").read_text(),
+                },
+            )
+
+
+@main.command()
+@click.option("--host", default="127.0.0.1", show_default=True, help="Coordinator address.")
+@click.option("--port", default=5555, show_default=True)
+@click.option("--token", envvar="RUNNER_TOKEN", default="", help="Shared secret of the coordinator.")
+@click.option("--n-jobs", type=int, default=None, help="Cases to run at once.  [default: physical cores]")
+@click.option("--pin/--no-pin", default=True, show_default=True, help="Pin each case to a dedicated core.")
+@click.option(
+    "--work-dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    default=None,
+    help="Where sources and builds go; reuse it to keep the C++ build.  [default: a new temp dir]",
+)
+def worker(host, port, token, n_jobs, pin, work_dir):
+    work_dir = work_dir or Path(tempfile.mkdtemp(prefix="ahc_worker_"))
+    n_jobs, cores = runner.worker_cores(n_jobs, pin)
+    solvers = {}
+    lock = threading.Lock()
+    with runner.core_pool(cores) as core_queue:
+        name = f"{socket.gethostname()}:{os.getpid()}"
+        threads = [
+            threading.Thread(
+                target=work,
+                args=(host, port, token, f"{name}.{i}", work_dir, core_queue, solvers, lock),
+            )
+            for i in range(n_jobs)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+
+if __name__ == "__main__":
+    main()
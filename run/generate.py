@@ -0,0 +1,43 @@
+import os
+import random
+from pathlib import Path
+
+import click
+from joblib import Parallel, delayed
+
+N = 20
+M = 40
+
+
+def generate_case(seed):
+    # Start cell followed by M - 1 destinations, all distinct
+    rng = random.Random(seed)
+    cells = rng.sample(range(N * N), M)
+    return f"{N} {M}\n" + "".join(f"{cell // N} {cell % N}\n" for cell in cells)
+
+
+def write_case(seed, in_dir, overwrite):
+    input_path = in_dir / f"{seed:04d}.txt"
+    if input_path.exists() and not overwrite:
+        return False
+    input_path.write_text(generate_case(seed))
+    return True
+
+
+@click.command()
+@click.argument("start_seed", default=0)
+@click.argument("end_seed", default=99)
+@click.option("--overwrite", is_flag=True, help="Replace existing input files (e.g. the official ones).")
+def main(start_seed, end_seed, overwrite):
+    workspace_dir = Path(os.getenv("WORKSPACE_DIR", "."))
+    in_dir = workspace_dir / "io" / "in"
+    in_dir.mkdir(parents=True, exist_ok=True)
+
+    written = Parallel(n_jobs=-1, batch_size=256)(
+        delayed(write_case)(seed, in_dir, overwrite) for seed in range(start_seed, end_seed + 1)
+    )
+    print(f"Generated {sum(written)} cases, skipped {len(written) - sum(written)} existing")
+
+
+if __name__ == "__main__":
+    main()
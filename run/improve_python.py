@@ -0,0 +1,108 @@
+import os
+import random
+import shutil
+from pathlib import Path
+
+import click
+from joblib import Parallel, delayed
+from tqdm.auto import tqdm
+
+import generate
+import judge
+import runner
+
+
+def improves(result, best):
+    if result["status"] != "OK":
+        return False
+    if best is None or result["score"] > best:
+        return True
+    if result["score"] < best:
+        return False
+    # Same judge score: keep it if the solver's own objective beat the output it resumed from
+    record = result["record"]
+    return "initial_score" in record and int(result["reported_score"]) > record["initial_score"]
+
+
+def best_score(case_no, workspace_dir, generate_input):
+    # Judge score of the output currently kept in io/out, or None if there is none yet
+    output_path = workspace_dir / "io" / "out" / f"{case_no:04d}.txt"
+    if not output_path.exists():
+        return None
+    input_path = workspace_dir / "io" / "in" / f"{case_no:04d}.txt"
+    input_text = generate.generate_case(case_no) if generate_input else input_path.read_text()
+    score, violation = judge.judge(input_text, output_path.read_text())
+    return None if violation is not None else score
+
+
+@click.command()
+@click.argument("start_case", default=0)
+@click.argument("end_case", default=99)
+@click.option("--rounds", default=5, show_default=True, help="Warm-started runs per case.")
+@click.option("--seed", type=int, default=None, help="Seed of the first round.  [default: random]")
+@click.option("--time-limit", default=2.0, show_default=True, help="Per-case time limit in seconds.")
+@click.option("--n-jobs", type=int, default=None, help="Number of workers.  [default: physical cores]")
+@click.option("--generate", "generate_input", is_flag=True, help="Generate inputs from the case numbers as seeds.")
+def main(start_case, end_case, rounds, seed, time_limit, n_jobs, generate_input):
+    workspace_dir = Path(os.getenv("WORKSPACE_DIR", "."))
+    out_dir = workspace_dir / "io" / "out"
+    improve_dir = workspace_dir / "io" / "improve"
+    out_dir.mkdir(exist_ok=True)
+    (improve_dir / "out").mkdir(parents=True, exist_ok=True)
+    (improve_dir / "err").mkdir(parents=True, exist_ok=True)
+    case_nos = list(range(start_case, end_case + 1))
+
+    if seed is None:
+        seed = random.randrange(2**31)
+    print(f" Seed \t:\t {seed}")
+
+    best = {case_no: best_score(case_no, workspace_dir, generate_input) for case_no in case_nos}
+    history = [("start", None, sum(score or 0 for score in best.values()))]
+
+    n_jobs, cores = runner.worker_cores(n_jobs, True)
+    with runner.core_pool(cores) as core_queue:
+        for round_no in range(rounds):
+            # A fresh seed every round; the same seed from the same start would repeat the last search
+            solver = runner.python_solver(workspace_dir, params={"seed": seed + round_no})
+            improved = 0
+            for result in tqdm(
+                Parallel(n_jobs=n_jobs, batch_size=1, return_as="generator_unordered")(
+                    delayed(runner.run_case)(
+                        case_no,
+                        workspace_dir,
+                        solver,
+                        time_limit,
+                        core_queue,
+                        None,
+                        generate_input,
+                        improve_dir,
+                        None,
+                        out_dir / f"{case_no:04d}.txt",
+                    )
+                    for case_no in case_nos
+                ),
+                total=len(case_nos),
+                desc=f"Round {round_no}",
+            ):
+                case_no = result["case_no"]
+                # Write back only improvements so io/out always holds the best output seen so far
+                if improves(result, best[case_no]):
+                    initial = result["record"].get("initial_score", "-")
+                    tqdm.write(
+                        f"Case {case_no:04d} \t judge {best[case_no]} -> {result['score']}"
+                        f" \t solver {initial} -> {result['reported_score']}"
+                    )
+                    shutil.copyfile(improve_dir / "out" / f"{case_no:04d}.txt", out_dir / f"{case_no:04d}.txt")
+                    best[case_no] = result["score"]
+                    improved += 1
+            history.append((round_no, improved, sum(score or 0 for score in best.values())))
+
+    print("###########################################")
+    print(" Round \t improved \t total best score")
+    for round_no, improved, total in history:
+        print(f" {round_no} \t {'-' if improved is None else improved} \t {total}")
+    print("###########################################")
+
+
+if __name__ == "__main__":
+    main()
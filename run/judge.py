@@ -0,0 +1,63 @@
+"""Local judge: replays an output against an input with the rules in docs/problem.md."""
+
+ACTIONS = ("M", "S", "A")
+
+
+def parse_input(text):
+    tokens = text.split()
+    n, m = int(tokens[0]), int(tokens[1])
+    coords = [(int(tokens[2 + 2 * k]), int(tokens[3 + 2 * k])) for k in range(m)]
+    return n, m, coords
+
+
+def judge(input_text, output_text):
+    """
+    Replay an output and score it.
+
+    Returns (score, violation).  violation is None for a legal output, otherwise a
+    message describing the first illegal turn, and the score is 0 as on the judge.
+    """
+    n, m, coords = parse_input(input_text)
+    # Flat grid with a one-cell border that is always blocked, so bounds checks become block checks
+    w = n + 2
+    outside = bytearray(w * w)
+    for k in range(w):
+        outside[k] = outside[(w - 1) * w + k] = outside[k * w] = outside[k * w + w - 1] = 1
+    blocked = bytearray(outside)
+    steps = {"U": -w, "D": w, "L": -1, "R": 1}
+
+    targets = [(i + 1) * w + j + 1 for i, j in coords]
+    pos = targets[0]
+    visited = 0
+    target = targets[1] if m > 1 else -1
+
+    lines = [line for line in output_text.splitlines() if line.strip()]
+    if len(lines) > 2 * n * m:
+        return 0, f"too many actions: {len(lines)} > {2 * n * m}"
+
+    for t, line in enumerate(lines):
+        parts = line.split()
+        if len(parts) != 2 or parts[0] not in ACTIONS or parts[1] not in steps:
+            return 0, f"turn {t}: invalid action {line!r}"
+        act = parts[0]
+        step = steps[parts[1]]
+        if act == "M":
+            pos += step
+            if blocked[pos]:
+                return 0, f"turn {t}: moved into a block"
+            # Only a move counts as a visit; sliding over a destination does not
+            if pos == target:
+                visited += 1
+                target = targets[visited + 1] if visited + 1 < m else -1
+        elif act == "S":
+            while not blocked[pos + step]:
+                pos += step
+        else:
+            cell = pos + step
+            if outside[cell]:
+                return 0, f"turn {t}: altered a cell outside the grid"
+            blocked[cell] ^= 1
+
+    if visited < m - 1:
+        return visited + 1, None
+    return m + 2 * n * m - len(lines), None
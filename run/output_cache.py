@@ -0,0 +1,46 @@
+import hashlib
+import json
+import shutil
+
+
+def solver_key(paths, params):
+    """Hash of everything about the solver that can change its output, except the input itself."""
+    h = hashlib.sha256()
+    for path in paths:
+        h.update(path.as_posix().encode())
+        h.update(path.read_bytes())
+    h.update(json.dumps(params, sort_keys=True, default=str).encode())
+    return h.hexdigest()
+
+
+class OutputCache:
+    def __init__(self, cache_dir, solver_key, force=False):
+        self.cache_dir = cache_dir
+        self.solver_key = solver_key
+        self.force = force
+
+    def case_key(self, input_text):
+        h = hashlib.sha256(self.solver_key.encode())
+        h.update(input_text.encode())
+        return h.hexdigest()
+
+    def load(self, key, output_path, error_path):
+        entry_dir = self.cache_dir / key[:2] / key
+        if self.force or not (entry_dir / "result.json").exists():
+            return None
+        shutil.copyfile(entry_dir / "stdout.txt", output_path)
+        shutil.copyfile(entry_dir / "stderr.txt", error_path)
+        with (entry_dir / "result.json").open("r") as f:
+            return json.load(f)
+
+    def store(self, key, output_path, error_path, result):
+        # Only successful runs are cached; TLE/RE depend on load and should be retried
+        if result["status"] != "OK":
+            return
+        entry_dir = self.cache_dir / key[:2] / key
+        entry_dir.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(output_path, entry_dir / "stdout.txt")
+        shutil.copyfile(error_path, entry_dir / "stderr.txt")
+        # result.json last: its presence marks the entry complete
+        with (entry_dir / "result.json").open("w") as f:
+            json.dump(result, f)
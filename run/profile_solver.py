@@ -0,0 +1,164 @@
+"""
+Run a solver script under a profiler.
+
+    python3 profile_solver.py cprofile out.prof main.py
+    python3 profile_solver.py sample out.collapsed main.py
+    python3 profile_solver.py tracemalloc out.json main.py
+
+cprofile writes pstats data; sample takes a stack every millisecond of CPU time
+(setitimer/SIGPROF) and writes collapsed stacks ("a;b;c count") for flame graphs;
+tracemalloc writes peak traced memory, the top allocation sites and per-phase growth
+as JSON.
+"""
+
+import cProfile
+import collections
+import json
+import os
+import runpy
+import signal
+import sys
+
+SAMPLE_INTERVAL = 0.001
+TOP_SITES = 10
+# Deep enough to reach the solver line through copy.deepcopy's recursion
+TRACEBACK_FRAMES = 12
+# Solver functions called between search phases; each call closes the current phase
+PHASE_MARKERS = ("recall_steps",)
+
+
+def frame_name(frame):
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+def run_sampled(script_path, out_path):
+    stacks = collections.Counter()
+    skip = {__file__, os.path.abspath(__file__), runpy.__file__, "<frozen runpy>"}
+
+    def on_sample(signum, frame):
+        names = []
+        while frame is not None and frame.f_code.co_filename not in skip:
+            names.append(frame_name(frame))
+            frame = frame.f_back
+        if names:
+            stacks[";".join(reversed(names))] += 1
+
+    signal.signal(signal.SIGPROF, on_sample)
+    signal.setitimer(signal.ITIMER_PROF, SAMPLE_INTERVAL, SAMPLE_INTERVAL)
+    try:
+        runpy.run_path(script_path, run_name="__main__")
+    finally:
+        signal.setitimer(signal.ITIMER_PROF, 0)
+        with open(out_path, "w") as f:
+            for stack, count in stacks.items():
+                f.write(f"{stack} {count}\n")
+
+
+def run_cprofile(script_path, out_path):
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        runpy.run_path(script_path, run_name="__main__")
+    finally:
+        profiler.disable()
+        profiler.dump_stats(out_path)
+
+
+def run_tracemalloc(script_path, out_path):
+    import tracemalloc
+
+    phases = []
+    largest = {"size": -1, "snapshot": None}
+
+    def close_phase():
+        current, peak = tracemalloc.get_traced_memory()
+        start = phases[-1]["current_kb"] if phases else 0
+        phases.append({"name": f"phase {len(phases)}", "current_kb": current / 1024, "peak_kb": peak / 1024})
+        phases[-1]["growth_kb"] = phases[-1]["current_kb"] - start
+        # Keep the snapshot taken with the most live memory for the allocation site ranking
+        if current > largest["size"]:
+            largest["size"] = current
+            largest["snapshot"] = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+
+    def marked(func):
+        def wrapper(*args, **kwargs):
+            close_phase()
+            return func(*args, **kwargs)
+
+        return wrapper
+
+    tracemalloc.start(TRACEBACK_FRAMES)
+    try:
+        # Load the solver as a module so its phase markers can be wrapped before main() runs
+        solver = runpy.run_path(script_path, run_name="__solver__")
+        for name in PHASE_MARKERS:
+            if name in solver:
+                solver["main"].__globals__[name] = marked(solver[name])
+        solver["main"]()
+        close_phase()
+    finally:
+        peak_kb = max((phase["peak_kb"] for phase in phases), default=0)
+        tracemalloc.stop()
+        # Attribute each allocation to the innermost solver line (e.g. the deepcopy call, not copy.py)
+        sites = collections.Counter()
+        counts = collections.Counter()
+        solver_files = {script_path, os.path.abspath(script_path)}
+        if largest["snapshot"] is not None:
+            for stat in largest["snapshot"].statistics("traceback"):
+                frame = next((f for f in reversed(stat.traceback) if f.filename in solver_files), stat.traceback[-1])
+                site = f"{os.path.basename(frame.filename)}:{frame.lineno}"
+                sites[site] += stat.size
+                counts[site] += stat.count
+        top = [
+            {"site": site, "size_kb": size / 1024, "count": counts[site]} for site, size in sites.most_common(TOP_SITES)
+        ]
+        with open(out_path, "w") as f:
+            json.dump({"peak_kb": peak_kb, "phases": phases, "top": top}, f)
+
+
+def summarize_tracemalloc(reports):
+    """Format {case_no: report} written by the tracemalloc mode as a table."""
+    lines = [" Case \t peak (MB) \t top allocation site"]
+    for case_no, report in sorted(reports.items()):
+        site = report["top"][0] if report["top"] else {"site": "-", "size_kb": 0}
+        lines.append(f" {case_no:04d} \t {report['peak_kb'] / 1024:.2f} \t {site['site']} ({site['size_kb'] / 1024:.2f} MB)")
+
+    peaks = [report["peak_kb"] / 1024 for report in reports.values()]
+    lines.append(f" Peak traced memory \t:\t mean {sum(peaks) / len(peaks):.2f} / max {max(peaks):.2f} MB")
+
+    lines.append(" Phase (split at recall_steps calls) \t mean growth (MB) \t mean peak (MB)")
+    by_phase = collections.defaultdict(list)
+    for report in reports.values():
+        for phase in report["phases"]:
+            by_phase[phase["name"]].append(phase)
+    for name, phases in by_phase.items():
+        growth = sum(phase["growth_kb"] for phase in phases) / len(phases) / 1024
+        peak = sum(phase["peak_kb"] for phase in phases) / len(phases) / 1024
+        lines.append(f" {name} \t {growth:+.2f} \t {peak:.2f}")
+
+    lines.append(" Top allocation sites (summed over cases):")
+    sites = collections.Counter()
+    for report in reports.values():
+        for site in report["top"]:
+            sites[site["site"]] += site["size_kb"]
+    for site, size_kb in sites.most_common(TOP_SITES):
+        lines.append(f"  {site} \t {size_kb / 1024 / len(reports):.2f} MB per case")
+    return "\n".join(lines)
+
+
+def main():
+    mode, out_path, script_path = sys.argv[1:4]
+    sys.argv = [script_path, *sys.argv[4:]]
+    sys.path.insert(0, os.path.dirname(os.path.abspath(script_path)))
+    if mode == "sample":
+        run_sampled(script_path, out_path)
+    elif mode == "tracemalloc":
+        run_tracemalloc(script_path, out_path)
+    else:
+        run_cprofile(script_path, out_path)
+
+
+if __name__ == "__main__":
+    main()
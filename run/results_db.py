@@ -0,0 +1,106 @@
+import datetime
+import hashlib
+import sqlite3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at TEXT NOT NULL,
+    language TEXT NOT NULL,
+    source_hash TEXT NOT NULL,
+    total_score INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id INTEGER NOT NULL REFERENCES runs (run_id),
+    case_no INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    score INTEGER,
+    time_ms REAL NOT NULL,
+    user_ms REAL NOT NULL,
+    sys_ms REAL NOT NULL,
+    max_rss_kb INTEGER NOT NULL,
+    PRIMARY KEY (run_id, case_no)
+);
+"""
+
+
+def source_hash(*paths):
+    h = hashlib.sha256()
+    for path in paths:
+        h.update(path.read_bytes())
+    return h.hexdigest()[:12]
+
+
+def connect(db_path):
+    con = sqlite3.connect(db_path)
+    con.row_factory = sqlite3.Row
+    con.executescript(SCHEMA)
+    return con
+
+
+def record_run(con, language, solver_hash, total_score, results):
+    with con:
+        cur = con.execute(
+            "INSERT INTO runs (created_at, language, source_hash, total_score) VALUES (?, ?, ?, ?)",
+            (datetime.datetime.now().isoformat(timespec="seconds"), language, solver_hash, total_score),
+        )
+        run_id = cur.lastrowid
+        con.executemany(
+            "INSERT INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    run_id,
+                    r["case_no"],
+                    r["status"],
+                    None if r["score"] is None else int(r["score"]),
+                    r["time_ms"],
+                    r["user_ms"],
+                    r["sys_ms"],
+                    r["max_rss_kb"],
+                )
+                for r in results
+            ],
+        )
+    return run_id
+
+
+def load_run(con, run_id):
+    run = con.execute("SELECT * FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+    if run is None:
+        raise KeyError(f"run {run_id} not found")
+    rows = con.execute("SELECT * FROM results WHERE run_id = ?", (run_id,)).fetchall()
+    return dict(run), {row["case_no"]: dict(row) for row in rows}
+
+
+def print_diff(results, baseline_run, baseline_results):
+    # Failed cases count as 0 on both sides, so a new TLE/RE shows up as a full regression
+    print("###########################################")
+    print(f" Baseline \t:\t run {baseline_run['run_id']} ({baseline_run['created_at']}, {baseline_run['source_hash']})")
+    print(" Case \t base \t new \t delta \t rel \t time delta")
+    total_delta = 0
+    relative_deltas = []
+    improved = worsened = 0
+    for r in results:
+        base = baseline_results.get(r["case_no"])
+        if base is None:
+            continue
+        base_score = base["score"] if base["status"] == "OK" else 0
+        score = int(r["score"]) if r["status"] == "OK" else 0
+        delta = score - base_score
+        relative = delta / base_score if base_score else 0.0
+        total_delta += delta
+        relative_deltas.append(relative)
+        improved += delta > 0
+        worsened += delta < 0
+        if delta != 0:
+            print(
+                f" {r['case_no']:04d} \t {base_score} \t {score} \t {delta:+d} \t {relative:+.2%}"
+                f" \t {r['time_ms'] - base['time_ms']:+.1f} ms"
+            )
+    if relative_deltas:
+        print(f" Compared cases \t:\t {len(relative_deltas)} ({improved} better / {worsened} worse)")
+        print(f" Total delta \t:\t {total_delta:+d}")
+        print(f" Mean rel delta \t:\t {sum(relative_deltas) / len(relative_deltas):+.3%}")
+    else:
+        print(" No cases in common with the baseline")
+    print("###########################################")
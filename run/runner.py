@@ -0,0 +1,610 @@
+"""Runner core shared by the Python and C++ runners: building, scheduling, timeouts, judging and reporting."""
+
+import collections
+import contextlib
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import pstats
+import py_compile
+import signal
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import click
+from joblib import Parallel, delayed
+from tqdm.auto import tqdm
+
+import generate
+import judge
+import output_cache
+import profile_solver
+import results_db
+
+CALIBRATION_LOOPS = 3_000_000
+CPP_COMPILER = "g++-12"
+CPP_FLAGS = ["-std=gnu++20", "-O2", "-Wall", "-Wextra"]
+PROFILER_PATH = Path(__file__).resolve().parent / "profile_solver.py"
+PROFILE_SUFFIXES = {"cprofile": "prof", "sample": "collapsed", "tracemalloc": "json"}
+# tracemalloc with deep tracebacks makes recall_steps' deepcopies very slow
+PROFILE_TIME_LIMIT_FACTORS = {"cprofile": 3, "sample": 3, "tracemalloc": 30}
+RSS_SAMPLE_INTERVAL = 0.01
+
+
+class Solver:
+    """
+    A runnable solver.
+
+    command reads the input on stdin; source_path identifies the solver in the run history;
+    cache_paths and cache_params are everything else that can change its output.
+    """
+
+    def __init__(self, language, command, source_path, cache_paths, cache_params, params=None):
+        self.language = language
+        self.command = command
+        self.source_path = source_path
+        self.cache_paths = cache_paths
+        self.cache_params = cache_params
+        self.params = params or {}
+
+
+def python_solver(workspace_dir, script_path=None, params=None):
+    script_path = script_path or workspace_dir / "python" / "main.py"
+    py_compile.compile(script_path)
+    return Solver(
+        "python",
+        ["python3", script_path],
+        script_path,
+        [script_path, *sorted((workspace_dir / "python" / "lib").glob("*.py"))],
+        {"python": sys.version},
+        params,
+    )
+
+
+def profiled_solver(solver, time_limit, profile_mode):
+    # Profilers slow the solver down: the time limit and the solver's own phase deadlines
+    # (time_scale in SOLVER_PARAMS) grow by the same factor, so every phase still gets its share
+    factor = PROFILE_TIME_LIMIT_FACTORS[profile_mode]
+    params = {**solver.params, "time_scale": solver.params.get("time_scale", 1.0) * factor}
+    scaled = Solver(
+        solver.language, solver.command, solver.source_path, solver.cache_paths, solver.cache_params, params
+    )
+    return scaled, time_limit * factor
+
+
+def cpp_solver(workspace_dir, source_path=None):
+    source_path = source_path or workspace_dir / "cpp" / "main.cpp"
+    binary_path = build_cpp(workspace_dir, source_path)
+    return Solver("cpp", [binary_path.as_posix()], source_path, [source_path], {"flags": CPP_FLAGS})
+
+
+def build_cpp(workspace_dir, source_path):
+    # Binaries are cached by source, compiler and flags, so an unchanged solver is never rebuilt
+    compiler_version = subprocess.run([CPP_COMPILER, "--version"], capture_output=True, text=True).stdout
+    h = hashlib.sha256(source_path.read_bytes())
+    h.update(json.dumps([compiler_version, CPP_FLAGS]).encode())
+    binary_path = workspace_dir / "cpp" / "build" / h.hexdigest()[:16] / "main"
+    if binary_path.exists():
+        return binary_path
+
+    binary_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = binary_path.with_name(f"main.{os.getpid()}.tmp")
+    subprocess.run([CPP_COMPILER, *CPP_FLAGS, "-o", tmp_path, source_path], check=True)
+    os.replace(tmp_path, binary_path)
+    return binary_path
+
+
+def make_cache(workspace_dir, solver, time_limit, force):
+    return output_cache.OutputCache(
+        workspace_dir / "io" / "cache",
+        output_cache.solver_key(
+            solver.cache_paths,
+            {"language": solver.language, **solver.cache_params, "params": solver.params, "time_limit": time_limit},
+        ),
+        force,
+    )
+
+
+def physical_cores():
+    # One logical CPU per physical core, so hyper-thread siblings never run two solvers at once
+    cores = {}
+    for cpu in sorted(os.sched_getaffinity(0)):
+        topology = Path(f"/sys/devices/system/cpu/cpu{cpu}/topology")
+        try:
+            key = ((topology / "physical_package_id").read_text(), (topology / "core_id").read_text())
+        except OSError:
+            key = cpu
+        cores.setdefault(key, cpu)
+    return sorted(cores.values())
+
+
+@contextlib.contextmanager
+def pinned_core(core_queue):
+    # Borrow a free core for the duration of one case; the solver inherits the affinity
+    if core_queue is None:
+        yield None
+        return
+    core = core_queue.get()
+    affinity = os.sched_getaffinity(0)
+    os.sched_setaffinity(0, {core})
+    try:
+        yield core
+    finally:
+        # The worker outlives the case; it must not stay on a core another case may now own
+        os.sched_setaffinity(0, affinity)
+        core_queue.put(core)
+
+
+@contextlib.contextmanager
+def core_pool(cores):
+    # Shared queue of free cores; None disables pinning
+    if cores is None:
+        yield None
+        return
+    with multiprocessing.Manager() as manager:
+        core_queue = manager.Queue()
+        for core in cores:
+            core_queue.put(core)
+        yield core_queue
+
+
+def calibrate(core):
+    # Fixed CPU-bound loop; its throughput makes timings comparable across machines
+    if core is not None:
+        os.sched_setaffinity(0, {core})
+    start_time = time.perf_counter()
+    x = 0
+    for i in range(CALIBRATION_LOOPS):
+        x = (x * 31 + i) % 1000003
+    return CALIBRATION_LOOPS / (time.perf_counter() - start_time) / 1e6
+
+
+def kill_process_group(pid):
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass  # already finished
+
+
+def sample_peak_rss(pid, stop, peak):
+    # VmHWM is the solver's own high-water mark; rusage's ru_maxrss also counts the runner's, inherited at fork.
+    # It only grows, so the last reading before exit is the peak, missing at most one interval of growth.
+    status_path = Path(f"/proc/{pid}/status")
+    while True:
+        try:
+            for line in status_path.read_text().splitlines():
+                if line.startswith("VmHWM:"):
+                    peak[0] = int(line.split()[1])
+        except OSError:
+            pass  # exited between readings
+        if stop.wait(RSS_SAMPLE_INTERVAL):
+            return
+
+
+def judge_case(result, input_text, output_path):
+    # Score the output independently instead of trusting the score the solver printed
+    score, violation = judge.judge(input_text, output_path.read_text())
+    status = result["status"]
+    if violation is not None and status in ("OK", "NO_SCORE"):
+        status = "WA"
+    return {**result, "status": status, "score": score, "reported_score": result["score"], "violation": violation}
+
+
+def solver_env(solver, record_path, initial_path=None):
+    env = {**os.environ, "SOLVER_PARAMS": json.dumps(solver.params), "SOLVER_RESULT_PATH": str(record_path)}
+    # Warm start: the solver resumes its search from this earlier output
+    if initial_path is not None:
+        env["SOLVER_INITIAL_PATH"] = str(initial_path)
+    return env
+
+
+def read_record(record_path, error_path):
+    """Return the solver's JSON result record, or {"score": ...} from stderr for solvers that do not write one."""
+    try:
+        with record_path.open("r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        pass  # no record, or the solver was killed while writing it
+    with error_path.open("r") as errfile:
+        for line in errfile:
+            if line.startswith("score "):
+                return {"score": line.split()[-1]}
+    return {}
+
+
+def run_case(
+    case_no,
+    workspace_dir,
+    solver,
+    time_limit,
+    core_queue=None,
+    cache=None,
+    generate_input=False,
+    output_dir=None,
+    profile_mode=None,
+    initial_path=None,
+):
+    output_dir = output_dir or workspace_dir / "io"
+    input_path = workspace_dir / "io" / "in" / f"{case_no:04d}.txt"
+    output_path = output_dir / "out" / f"{case_no:04d}.txt"
+    error_path = output_dir / "err" / f"{case_no:04d}.txt"
+    record_path = output_dir / "result" / f"{case_no:04d}.json"
+
+    # Generated inputs go straight to the solver's stdin without touching io/in
+    input_text = generate.generate_case(case_no) if generate_input else input_path.read_text()
+
+    if initial_path is not None:
+        cache = None  # the output depends on the initial solution, which the cache key does not cover
+    if cache is not None:
+        cache_key = cache.case_key(input_text)
+        cached = cache.load(cache_key, output_path, error_path)
+        if cached is not None:
+            return judge_case({**cached, "case_no": case_no, "core": None, "cached": True}, input_text, output_path)
+
+    command = solver.command
+    if profile_mode is not None:
+        # Python only: run the script through the profiler wrapper with the same interpreter
+        profile_path = output_dir / "profile" / f"{case_no:04d}.{PROFILE_SUFFIXES[profile_mode]}"
+        command = [command[0], PROFILER_PATH, profile_mode, profile_path, *command[1:]]
+
+    # A stale record from an earlier run must not be mistaken for this run's
+    record_path.parent.mkdir(exist_ok=True)
+    record_path.unlink(missing_ok=True)
+
+    # Run the solver with the specified input and output redirection
+    with (
+        pinned_core(core_queue) as core,
+        output_path.open("w") as outfile,
+        error_path.open("w") as errfile,
+    ):
+        start_time = time.perf_counter()
+        process = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=outfile,
+            stderr=errfile,
+            start_new_session=True,
+            env=solver_env(solver, record_path, initial_path),
+        )
+        # Kill the whole process group once the time limit is exceeded so a hung solver cannot stall the batch
+        timer = threading.Timer(time_limit, kill_process_group, (process.pid,))
+        timer.start()
+        peak_rss = [0]
+        stop_sampling = threading.Event()
+        sampler = threading.Thread(target=sample_peak_rss, args=(process.pid, stop_sampling, peak_rss))
+        sampler.start()
+        try:
+            process.stdin.write(input_text.encode())
+            process.stdin.close()
+        except BrokenPipeError:
+            pass  # solver exited without reading its input
+        # wait4 gives the child's own rusage, so CPU time excludes the runner itself
+        _, wait_status, rusage = os.wait4(process.pid, 0)
+        end_time = time.perf_counter()
+        timer.cancel()
+        stop_sampling.set()
+        sampler.join()
+    process.returncode = os.waitstatus_to_exitcode(wait_status)
+    time_ms = (end_time - start_time) * 1000
+
+    record = read_record(record_path, error_path)
+    score = record.pop("score", None)
+
+    if time_ms > time_limit * 1000:
+        status = "TLE"
+    elif process.returncode != 0:
+        status = "RE"
+    elif score is None:
+        status = "NO_SCORE"
+    else:
+        status = "OK"
+
+    result = {
+        "case_no": case_no,
+        "status": status,
+        "core": core,
+        "cached": False,
+        "score": score,
+        "time_ms": time_ms,
+        "user_ms": rusage.ru_utime * 1000,
+        "sys_ms": rusage.ru_stime * 1000,
+        "max_rss_kb": peak_rss[0],
+        "record": record,
+    }
+    if cache is not None:
+        cache.store(cache_key, output_path, error_path, result)
+    return judge_case(result, input_text, output_path)
+
+
+def load_timings(timings_path):
+    if not timings_path.exists():
+        return {}
+    with timings_path.open("r") as f:
+        return {int(case_no): time_ms for case_no, time_ms in json.load(f).items()}
+
+
+def save_timings(timings_path, timings, results):
+    timings.update({r["case_no"]: r["time_ms"] for r in results})
+    with timings_path.open("w") as f:
+        json.dump(timings, f)
+
+
+def schedule_cases(case_nos, timings):
+    # Longest-first keeps every worker busy until the end of the sweep.
+    # Cases without history go first in numeric order since they may be the slow ones.
+    unknown = [case_no for case_no in case_nos if case_no not in timings]
+    known = sorted((case_no for case_no in case_nos if case_no in timings), key=lambda c: -timings[c])
+    return unknown + known
+
+
+def worker_cores(n_jobs, pin):
+    """Return (n_jobs, cores) where cores is None when workers are not pinned."""
+    cores = physical_cores()
+    n_jobs = n_jobs or len(cores)
+    # Dedicated cores are only possible when there are enough of them
+    if pin and n_jobs <= len(cores):
+        return n_jobs, cores[:n_jobs]
+    return n_jobs, None
+
+
+def run_cases(
+    workspace_dir,
+    solver,
+    case_nos,
+    time_limit,
+    n_jobs=None,
+    pin=True,
+    cache=None,
+    generate_input=False,
+    profile_mode=None,
+):
+    """Run cases longest-first on pinned workers, streaming each result as it finishes."""
+    timings_path = workspace_dir / "io" / f"timings_{solver.language}.json"
+    timings = load_timings(timings_path)
+    case_nos = schedule_cases(case_nos, timings)
+
+    n_jobs, cores = worker_cores(n_jobs, pin)
+    calibration = Parallel(n_jobs=n_jobs)(delayed(calibrate)(core) for core in cores or [None] * n_jobs)
+
+    results = []
+    with core_pool(cores) as core_queue:
+        for result in tqdm(
+            Parallel(n_jobs=n_jobs, batch_size=1, return_as="generator_unordered")(
+                delayed(run_case)(
+                    case_no,
+                    workspace_dir,
+                    solver,
+                    time_limit,
+                    core_queue,
+                    cache,
+                    generate_input,
+                    None,
+                    profile_mode,
+                )
+                for case_no in case_nos
+            ),
+            total=len(case_nos),
+            smoothing=0,
+            desc="Cases",
+        ):
+            tqdm.write(format_result(result))
+            results.append(result)
+
+    results.sort(key=lambda r: r["case_no"])
+    save_timings(timings_path, timings, results)
+    return results, calibration
+
+
+def format_result(result):
+    cached = " (cached)" if result["cached"] else ""
+    return f"Case {result['case_no']:04d} \t {result['status']} \t score {result['score']} \t {result['time_ms']:.1f} ms{cached}"
+
+
+def percentile(values, q):
+    # Linear interpolation between closest ranks (same as numpy's default)
+    values = sorted(values)
+    k = (len(values) - 1) * q / 100
+    lo = int(k)
+    hi = min(lo + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (k - lo)
+
+
+def aggregate_records(results):
+    """Mean of every numeric field of the solver records; list fields (e.g. per phase) are averaged elementwise."""
+    fields = collections.defaultdict(list)
+    for r in results:
+        for name, value in r.get("record", {}).items():
+            fields[name].append(value)
+    means = {}
+    for name, values in fields.items():
+        if all(isinstance(v, (int, float)) for v in values):
+            means[name] = sum(values) / len(values)
+        elif all(isinstance(v, list) for v in values):
+            columns = zip(*values)
+            means[name] = [sum(column) / len(values) for column in columns]
+    return means
+
+
+def print_summary(total_score, results, calibration):
+    times = [r["time_ms"] for r in results]
+    user_times = [r["user_ms"] for r in results]
+    sys_times = [r["sys_ms"] for r in results]
+    rss = [r["max_rss_kb"] / 1024 for r in results]
+    max_time_case = max(results, key=lambda r: r["time_ms"])["case_no"]
+    max_rss_case = max(results, key=lambda r: r["max_rss_kb"])["case_no"]
+
+    print("###########################################")
+    print(f" Total score \t:\t {total_score}")
+    print(" Execution time (ms):")
+    print(f"  Max \t:\t {max(times):.1f} ms (Case: {max_time_case})")
+    print(f"  Min \t:\t {min(times):.1f} ms")
+    print(f"  Mean \t:\t {sum(times) / len(times):.2f} ms")
+    print(f"  P50 \t:\t {percentile(times, 50):.1f} ms")
+    print(f"  P95 \t:\t {percentile(times, 95):.1f} ms")
+    print(f"  P99 \t:\t {percentile(times, 99):.1f} ms")
+    print(" CPU time (ms):")
+    print(f"  User \t:\t mean {sum(user_times) / len(user_times):.2f} / max {max(user_times):.1f} ms")
+    print(f"  Sys \t:\t mean {sum(sys_times) / len(sys_times):.2f} / max {max(sys_times):.1f} ms")
+    print(" Calibration (Mloops/s per worker):")
+    print(f"  Mean \t:\t {sum(calibration) / len(calibration):.2f} ({len(calibration)} workers)")
+    print(f"  Range \t:\t {min(calibration):.2f} - {max(calibration):.2f}")
+    print(" Peak RSS (MB, sampled VmHWM):")
+    print(f"  Max \t:\t {max(rss):.1f} MB (Case: {max_rss_case})")
+    print(f"  Mean \t:\t {sum(rss) / len(rss):.1f} MB")
+    record_means = aggregate_records(results)
+    if record_means:
+        print(" Solver record (mean over cases):")
+        for name, value in record_means.items():
+            if isinstance(value, list):
+                print(f"  {name} \t:\t [{', '.join(f'{v:.2f}' for v in value)}]")
+            else:
+                print(f"  {name} \t:\t {value:.2f}")
+    for status, label in (("TLE", "TLE"), ("RE", "Runtime error"), ("WA", "Wrong answer"), ("NO_SCORE", "No score")):
+        cases = [r["case_no"] for r in results if r["status"] == status]
+        if cases:
+            print(f"\n {label} information:")
+            print(f"  {label} count \t:\t {len(cases)}")
+            print(f"  {label} cases \t:\t {cases}")
+            if status == "WA":
+                first = next(r for r in results if r["status"] == "WA")
+                print(f"  First violation \t:\t case {first['case_no']}: {first['violation']}")
+    mismatch_cases = [r["case_no"] for r in results if r["status"] == "OK" and int(r["reported_score"]) != r["score"]]
+    if mismatch_cases:
+        print("\n Reported score differs from judge:")
+        print(f"  Mismatch count \t:\t {len(mismatch_cases)}")
+        print(f"  Mismatch cases \t:\t {mismatch_cases}")
+    print("###########################################")
+
+
+def print_case(result):
+    print("###########################################")
+    print(f"score \t:\t {result['reported_score']}")
+    print(f"judge \t:\t {result['score']}")
+    if result["violation"] is not None:
+        print(f"WA \t:\t {result['violation']}")
+    print(f"status \t:\t {result['status']}")
+    print(f"time \t:\t {result['time_ms']:.1f} ms")
+    print(f"user \t:\t {result['user_ms']:.1f} ms")
+    print(f"sys \t:\t {result['sys_ms']:.1f} ms")
+    print(f"rss \t:\t {result['max_rss_kb'] / 1024:.1f} MB")
+    for name, value in result.get("record", {}).items():
+        print(f"{name} \t:\t {value}")
+    print(f"case \t:\t {result['case_no']}")
+    print("###########################################")
+
+
+def aggregate_profiles(profile_dir, profile_mode, case_nos):
+    paths = [profile_dir / f"{case_no:04d}.{PROFILE_SUFFIXES[profile_mode]}" for case_no in case_nos]
+    paths = [path for path in paths if path.exists()]
+    if not paths:
+        return "No profile data was written"
+    report = io.StringIO()
+
+    if profile_mode == "cprofile":
+        stats = pstats.Stats(*map(str, paths), stream=report)
+        stats.dump_stats(profile_dir / "aggregate.prof")
+        stats.sort_stats("cumulative").print_stats(30)
+    elif profile_mode == "tracemalloc":
+        reports = {}
+        for path in paths:
+            with path.open("r") as f:
+                reports[int(path.stem)] = json.load(f)
+        report.write(profile_solver.summarize_tracemalloc(reports) + "\n")
+    else:
+        stacks = collections.Counter()
+        for path in paths:
+            with path.open("r") as f:
+                for line in f:
+                    stack, count = line.rsplit(" ", 1)
+                    stacks[stack] += int(count)
+        with (profile_dir / "aggregate.collapsed").open("w") as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+        # Inclusive (cumulative) and self samples per function
+        inclusive = collections.Counter()
+        exclusive = collections.Counter()
+        for stack, count in stacks.items():
+            frames = stack.split(";")
+            for name in set(frames):
+                inclusive[name] += count
+            exclusive[frames[-1]] += count
+        total = sum(stacks.values())
+        report.write(f"{total} samples from {len(paths)} cases\n")
+        report.write(f"{'cumulative':>12} {'self':>12}  function\n")
+        for name, count in inclusive.most_common(30):
+            report.write(f"{count / total:>11.1%} {exclusive[name] / total:>11.1%}   {name}\n")
+
+    (profile_dir / "aggregate.txt").write_text(report.getvalue())
+    return report.getvalue()
+
+
+def multi_run(
+    workspace_dir,
+    solver,
+    start_case,
+    end_case,
+    time_limit,
+    n_jobs,
+    pin,
+    baseline,
+    force,
+    generate_input,
+    profile_mode=None,
+):
+    # A cache hit would not produce a profile
+    cache = make_cache(workspace_dir, solver, time_limit, force or profile_mode is not None)
+    if profile_mode is not None:
+        (workspace_dir / "io" / "profile").mkdir(exist_ok=True)
+        solver, time_limit = profiled_solver(solver, time_limit, profile_mode)
+
+    case_nos = range(start_case, end_case + 1)
+    results, calibration = run_cases(
+        workspace_dir,
+        solver,
+        case_nos,
+        time_limit,
+        n_jobs,
+        pin,
+        cache,
+        generate_input,
+        profile_mode,
+    )
+
+    total_score = sum(int(r["score"]) for r in results if r["status"] == "OK")
+    print_summary(total_score, results, calibration)
+    if profile_mode is not None:
+        print(aggregate_profiles(workspace_dir / "io" / "profile", profile_mode, case_nos))
+
+    con = results_db.connect(workspace_dir / "io" / "results.sqlite3")
+    run_id = results_db.record_run(
+        con, solver.language, results_db.source_hash(solver.source_path), total_score, results
+    )
+    print(f" Run ID \t:\t {run_id}")
+    if baseline is not None:
+        results_db.print_diff(results, *results_db.load_run(con, baseline))
+    return results
+
+
+def multi_run_options(func):
+    """Command line options shared by the multi-case runners of every language."""
+    options = [
+        click.argument("start_case", default=0),
+        click.argument("end_case", default=99),
+        click.option("--time-limit", default=2.0, show_default=True, help="Per-case time limit in seconds."),
+        click.option("--n-jobs", type=int, default=None, help="Number of workers.  [default: physical cores]"),
+        click.option("--pin/--no-pin", default=True, show_default=True, help="Pin each worker to a dedicated core."),
+        click.option("--baseline", type=int, default=None, help="Run ID to print per-case deltas against."),
+        click.option("--force", is_flag=True, help="Re-run every case even if a cached output exists."),
+        click.option(
+            "--generate", "generate_input", is_flag=True, help="Generate inputs from the case numbers as seeds."
+        ),
+    ]
+    for option in reversed(options):
+        func = option(func)
+    return func
@@ -1,56 +1,21 @@
 import os
-import subprocess
-import time
 from pathlib import Path
 
 import click
 
+import runner
+
 
 @click.command()
 @click.argument("case_no", default=0)
-def main(case_no):
-    # Define the paths
+@click.option("--time-limit", default=2.0, show_default=True, help="Time limit in seconds.")
+def main(case_no, time_limit):
     workspace_dir = Path(os.getenv("WORKSPACE_DIR", "."))
-    input_path = workspace_dir / "io" / "in" / f"{case_no:04d}.txt"
-    output_path = workspace_dir / "io" / "out" / f"{case_no:04d}.txt"
-    error_path = workspace_dir / "io" / "err" / f"{case_no:04d}.txt"
-    main_script_path = workspace_dir / "cpp" / "main.cpp"
-    compiled_script_path = workspace_dir / "cpp" / "main"
-
-    # Compile the main.cpp script
-    subprocess.run(
-        [
-            "g++-12",
-            "-std=gnu++20",
-            "-O2",
-            "-Wall",
-            "-Wextra",
-            "-o",
-            compiled_script_path,
-            main_script_path,
-        ]
-    )
-
-    # Run the main executable with the specified input and output redirection
-    start_time = int(time.time() * 1000)
-    with input_path.open("r") as infile, output_path.open("w") as outfile, error_path.open("w") as errfile:
-        subprocess.run([compiled_script_path.as_posix()], stdin=infile, stdout=outfile, stderr=errfile)
-    end_time = int(time.time() * 1000)
-    time_ms = end_time - start_time
-
-    # Extract the score from the error file
-    with error_path.open("r") as errfile:
-        score = None
-        for line in errfile:
-            if "score" in line:
-                score = line.split()[-1]
-                break
+    # Compile the main.cpp script (reuses the cached binary when nothing changed)
+    solver = runner.cpp_solver(workspace_dir)
 
-    print("###########################################")
-    print(f"score \t:\t {score}")
-    print(f"time \t:\t {time_ms} ms")
-    print(f"case \t:\t {case_no}")
-    print("###########################################")
+    result = runner.run_case(case_no, workspace_dir, solver, time_limit)
+    runner.print_case(result)
 
 
 if __name__ == "__main__":
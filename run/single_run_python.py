@@ -1,45 +1,37 @@
+import json
 import os
-import py_compile
-import subprocess
-import time
 from pathlib import Path
 
 import click
 
+import profile_solver
+import runner
+
 
 @click.command()
 @click.argument("case_no", default=0)
-def main(case_no):
-    # Define the paths
+@click.option("--time-limit", default=2.0, show_default=True, help="Time limit in seconds.")
+@click.option("--tracemalloc", "use_tracemalloc", is_flag=True, help="Report peak memory and top allocation sites.")
+def main(case_no, time_limit, use_tracemalloc):
     workspace_dir = Path(os.getenv("WORKSPACE_DIR", "."))
-    input_path = workspace_dir / "io" / "in" / f"{case_no:04d}.txt"
-    output_path = workspace_dir / "io" / "out" / f"{case_no:04d}.txt"
-    error_path = workspace_dir / "io" / "err" / f"{case_no:04d}.txt"
-    main_script_path = workspace_dir / "python" / "main.py"
-
-    # Compile the main.py script
-    py_compile.compile(main_script_path)
-
-    # Run the main.py script with the specified input and output redirection
-    start_time = int(time.time() * 1000)
-    with input_path.open("r") as infile, output_path.open("w") as outfile, error_path.open("w") as errfile:
-        subprocess.run(["python3", main_script_path], stdin=infile, stdout=outfile, stderr=errfile)
-    end_time = int(time.time() * 1000)
-    time_ms = end_time - start_time
-
-    # Extract the score from the error file
-    with error_path.open("r") as errfile:
-        score = None
-        for line in errfile:
-            if "score" in line:
-                score = line.split()[-1]
-                break
-
-    print("###########################################")
-    print(f"score \t:\t {score}")
-    print(f"time \t:\t {time_ms} ms")
-    print(f"case \t:\t {case_no}")
-    print("###########################################")
+    solver = runner.python_solver(workspace_dir)
+
+    profile_mode = None
+    if use_tracemalloc:
+        profile_mode = "tracemalloc"
+        (workspace_dir / "io" / "profile").mkdir(exist_ok=True)
+        solver, time_limit = runner.profiled_solver(solver, time_limit, profile_mode)
+
+    result = runner.run_case(case_no, workspace_dir, solver, time_limit, profile_mode=profile_mode)
+    runner.print_case(result)
+    if use_tracemalloc:
+        profile_path = workspace_dir / "io" / "profile" / f"{case_no:04d}.json"
+        # A solver killed or crashed before the end never writes its profile
+        if not profile_path.exists():
+            print(f"No tracemalloc profile was written (status {result['status']})")
+            return
+        with profile_path.open("r") as f:
+            print(profile_solver.summarize_tracemalloc({case_no: json.load(f)}))
 
 
 if __name__ == "__main__":
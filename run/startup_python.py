@@ -0,0 +1,107 @@
+"""
+Startup-time report for the Python solver.
+
+Everything before main() reads its first input line counts against the judge's time limit
+but not against the search loop's own deadlines: interpreter startup, the solver's imports
+and module-level work.  This runs the solver a few times, under -X importtime and not, and reports
+the interpreter's own startup, the import time of every module the solver adds on top of
+it, and when main() started and read its first line (from the solver's result record,
+measured from process start).
+"""
+
+import collections
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from statistics import mean
+
+import click
+
+import generate
+
+
+def import_times(stderr):
+    # -X importtime lines: "import time: <self us> | <cumulative us> | <indent><module>"
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or line.endswith("imported package"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        # Two spaces of indentation per nesting level; depth 0 is imported by the script itself
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        times[name.strip()] = (depth, int(self_us), int(cumulative_us))
+    return times
+
+
+@click.command()
+@click.option("--solver", "script_path", type=click.Path(exists=True, dir_okay=False, path_type=Path), default=None)
+@click.option("--case", "case_no", default=0, show_default=True, help="Input to feed the solver.")
+@click.option("--runs", default=3, show_default=True)
+@click.option("--budget-ms", default=100.0, show_default=True, help="Allowed time from process start to first input.")
+def main(script_path, case_no, runs, budget_ms):
+    workspace_dir = Path(os.getenv("WORKSPACE_DIR", "."))
+    script_path = script_path or workspace_dir / "python" / "main.py"
+    input_path = workspace_dir / "io" / "in" / f"{case_no:04d}.txt"
+    input_text = input_path.read_text() if input_path.exists() else generate.generate_case(case_no)
+    # Same environment as on the judge: no SOLVER_PARAMS, so nothing is imported only for local runs
+    env = {key: value for key, value in os.environ.items() if key != "SOLVER_PARAMS"}
+
+    interpreter_ms = []
+    baseline_modules = set()
+    for _ in range(runs):
+        start_time = time.perf_counter()
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "pass"], env=env, capture_output=True, text=True
+        )
+        interpreter_ms.append((time.perf_counter() - start_time) * 1000)
+        baseline_modules |= set(import_times(completed.stderr))
+
+    solver_imports = collections.defaultdict(list)
+    for _ in range(runs):
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", script_path], input=input_text, env=env, capture_output=True, text=True
+        )
+        for name, timing in import_times(completed.stderr).items():
+            if name not in baseline_modules:
+                solver_imports[name].append(timing)
+
+    # Separate runs for the timestamps: writing the record imports json, which the judge never does
+    records = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        record_path = Path(tmp_dir) / "result.json"
+        for _ in range(runs):
+            subprocess.run(
+                [sys.executable, script_path],
+                input=input_text,
+                env={**env, "SOLVER_RESULT_PATH": str(record_path)},
+                capture_output=True,
+                text=True,
+            )
+            with record_path.open("r") as f:
+                records.append(json.load(f))
+
+    print("###########################################")
+    print(f" Solver \t:\t {script_path} ({runs} runs)")
+    print(f" Interpreter startup (python -c pass) \t:\t {mean(interpreter_ms):.1f} ms")
+    print(" Imports added by the solver (mean over runs, self / cumulative):")
+    direct = {name: timings for name, timings in solver_imports.items() if timings[0][0] == 0}
+    for name, timings in sorted(direct.items(), key=lambda item: -mean(t[2] for t in item[1])):
+        print(f"  {name} \t:\t {mean(t[1] for t in timings) / 1000:.2f} / {mean(t[2] for t in timings) / 1000:.2f} ms")
+    total_import_ms = sum(mean(t[2] for t in timings) for timings in direct.values()) / 1000
+    print(f"  Total \t:\t {total_import_ms:.2f} ms ({len(solver_imports)} modules)")
+    main_start_ms = mean(record["main_start"] for record in records) * 1000
+    first_input_ms = mean(record["first_input"] for record in records) * 1000
+    print(" From process start:")
+    print(f"  main() starts \t:\t {main_start_ms:.1f} ms")
+    print(f"  First input line \t:\t {first_input_ms:.1f} ms")
+    verdict = "within" if first_input_ms <= budget_ms else "OVER"
+    print(f"  Budget \t:\t {verdict} {budget_ms:.0f} ms")
+    print("###########################################")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+import hashlib
+import itertools
+import json
+import math
+import os
+import random
+from pathlib import Path
+
+import click
+from joblib import Parallel, delayed
+from tqdm.auto import tqdm
+
+import runner
+
+
+def expand_space(space):
+    # {"seed": [1, 2], "phase_timeouts": [[...], [...]]} -> list of parameter dicts (grid)
+    keys = sorted(space)
+    return [dict(zip(keys, values)) for values in itertools.product(*(space[key] for key in keys))]
+
+
+def config_id(params):
+    return hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()[:10]
+
+
+def run_config_case(config, case_no, *args):
+    return config, runner.run_case(case_no, *args)
+
+
+def mean_score(case_results):
+    return sum(r["score"] if r["status"] == "OK" else 0 for r in case_results.values()) / len(case_results)
+
+
+@click.command()
+@click.argument("space_path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--start-case", default=0, show_default=True)
+@click.option("--end-case", default=99, show_default=True)
+@click.option("--samples", type=int, default=None, help="Evaluate a random sample of the grid instead of all of it.")
+@click.option("--sample-seed", default=0, show_default=True)
+@click.option("--halving/--no-halving", default=True, show_default=True, help="Successive halving over the configs.")
+@click.option("--min-cases", default=10, show_default=True, help="Cases per config in the first halving rung.")
+@click.option("--eta", default=3, show_default=True, help="Keep the best 1/eta configs at every rung.")
+@click.option("--time-limit", default=2.0, show_default=True, help="Per-case time limit in seconds.")
+@click.option("--force", is_flag=True, help="Re-run every case even if a cached output exists.")
+@click.option("--generate", "generate_input", is_flag=True, help="Generate inputs from the case numbers as seeds.")
+def main(
+    space_path,
+    start_case,
+    end_case,
+    samples,
+    sample_seed,
+    halving,
+    min_cases,
+    eta,
+    time_limit,
+    force,
+    generate_input,
+):
+    workspace_dir = Path(os.getenv("WORKSPACE_DIR", "."))
+    sweep_dir = workspace_dir / "io" / "sweep"
+    case_nos = list(range(start_case, end_case + 1))
+
+    with open(space_path) as f:
+        configs = expand_space(json.load(f))
+    if samples is not None and samples < len(configs):
+        configs = random.Random(sample_seed).sample(configs, samples)
+    configs = {config_id(params): params for params in configs}
+
+    solvers = {}
+    caches = {}
+    for cid, params in configs.items():
+        (sweep_dir / cid / "out").mkdir(parents=True, exist_ok=True)
+        (sweep_dir / cid / "err").mkdir(parents=True, exist_ok=True)
+        solvers[cid] = runner.python_solver(workspace_dir, params=params)
+        caches[cid] = runner.make_cache(workspace_dir, solvers[cid], time_limit, force)
+
+    # Each rung evaluates the surviving configs on more cases; results from earlier rungs are reused
+    if halving:
+        rung_sizes = []
+        n = min(min_cases, len(case_nos))
+        while n < len(case_nos):
+            rung_sizes.append(n)
+            n *= eta
+        rung_sizes.append(len(case_nos))
+    else:
+        rung_sizes = [len(case_nos)]
+
+    n_jobs, cores = runner.worker_cores(None, True)
+    results = {cid: {} for cid in configs}
+    alive = list(configs)
+    with runner.core_pool(cores) as core_queue:
+        for rung, n_cases in enumerate(rung_sizes):
+            tasks = [(cid, case_no) for case_no in case_nos[:n_cases] for cid in alive if case_no not in results[cid]]
+            for cid, result in tqdm(
+                Parallel(n_jobs=n_jobs, batch_size=1, return_as="generator_unordered")(
+                    delayed(run_config_case)(
+                        cid,
+                        case_no,
+                        workspace_dir,
+                        solvers[cid],
+                        time_limit,
+                        core_queue,
+                        caches[cid],
+                        generate_input,
+                        sweep_dir / cid,
+                    )
+                    for cid, case_no in tasks
+                ),
+                total=len(tasks),
+                desc=f"Rung {rung} ({len(alive)} configs x {n_cases} cases)",
+            ):
+                results[cid][result["case_no"]] = result
+
+            for cid in alive:
+                with (sweep_dir / cid / "result.json").open("w") as f:
+                    json.dump(
+                        {
+                            "params": configs[cid],
+                            "mean_score": mean_score(results[cid]),
+                            "cases": [results[cid][case_no] for case_no in sorted(results[cid])],
+                        },
+                        f,
+                        indent=1,
+                    )
+            if rung < len(rung_sizes) - 1:
+                alive.sort(key=lambda cid: mean_score(results[cid]), reverse=True)
+                alive = alive[: max(1, math.ceil(len(alive) / eta))]
+
+    print("###########################################")
+    print(" Config \t cases \t mean score \t params")
+    for cid in sorted(configs, key=lambda cid: (len(results[cid]), mean_score(results[cid])), reverse=True):
+        print(f" {cid} \t {len(results[cid])} \t {mean_score(results[cid]):.2f} \t {json.dumps(configs[cid])}")
+    print("###########################################")
+
+
+if __name__ == "__main__":
+    main()